@@ -0,0 +1,133 @@
+import json
+import os
+
+import perf
+
+# 하루에 여러 번 남기는 감정 기록 (시각 포함)
+# - data/entries.jsonl: 한 줄에 기록 하나, 시각 순으로 정렬된 추가 전용 로그
+# - 날짜별 기록(records.json)에는 그날의 집계(rollup)만 저장합니다.
+#   emotion/color: 가장 많이 기록한 감정 (같으면 나중에 기록한 감정)
+#   note: 마지막 기록의 한 줄 일기
+#   entries, counts, first, last: 기록 수, 감정별 개수, 첫/마지막 기록 시각
+# 기존 주간/월간/캘린더/타임라인 화면은 집계만 읽으므로 기록이 늘어도 속도가 그대로입니다.
+ENTRIES_FILE = "data/entries.jsonl"
+
+def _last_line(path):
+    """파일 끝에서부터 읽어 마지막 줄만 반환"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        block = 1024
+        data = b""
+        while size > 0:
+            step = min(block, size)
+            size -= step
+            f.seek(size)
+            data = f.read(step) + data
+            lines = data.rstrip(b"\n").split(b"\n")
+            if len(lines) > 1 or size == 0:
+                return lines[-1].decode("utf-8")
+    return ""
+
+def last_timestamp():
+    if not os.path.exists(ENTRIES_FILE) or os.path.getsize(ENTRIES_FILE) == 0:
+        return None
+    line = _last_line(ENTRIES_FILE)
+    return json.loads(line)["timestamp"] if line else None
+
+@perf.timed("entries.append_entry")
+def append_entry(event):
+    """기록 하나를 로그에 추가
+
+    시각 순서대로 들어오면 파일 끝에 한 줄만 덧붙이고 True를 반환합니다.
+    과거 시각이 들어오면(뒤늦은 입력 등) 정렬 위치에 끼워 파일을 다시 쓰고 False를 반환합니다.
+    """
+    os.makedirs(os.path.dirname(ENTRIES_FILE), exist_ok=True)
+    line = json.dumps(event, ensure_ascii=False)
+    last = last_timestamp()
+
+    if last is None or event["timestamp"] >= last:
+        with open(ENTRIES_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        perf.count("entries.bytes_written", len(line.encode("utf-8")) + 1)
+        return True
+
+    events = load_entries()
+    events.append(event)
+    events.sort(key=lambda e: e["timestamp"])  # 안정 정렬이라 같은 시각은 입력 순서 유지
+    tmp_file = ENTRIES_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e, ensure_ascii=False) + "\n")
+    os.replace(tmp_file, ENTRIES_FILE)
+    return False
+
+def load_entries(date=None):
+    """로그의 기록 목록 (date를 주면 그날 기록만, 시각 순)"""
+    if not os.path.exists(ENTRIES_FILE):
+        return []
+    events = []
+    with open(ENTRIES_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if date is not None:
+                # 시각 순으로 정렬되어 있으므로 그날이 지나면 멈춤
+                day = event["timestamp"][:10]
+                if day < date:
+                    continue
+                if day > date:
+                    break
+            events.append(event)
+    return events
+
+def to_event(record):
+    """시각 정보가 없는 예전 날짜별 기록을 그날 0시 기록으로 변환"""
+    event = {
+        "timestamp": f"{record['date']}T00:00:00",
+        "note": record.get("note", ""),
+        "emotion": record["emotion"],
+        "color": record.get("color", "")
+    }
+    if record.get("weather"):
+        event["weather"] = record["weather"]
+    return event
+
+def rollup(previous, event):
+    """기존 날짜 집계에 기록 하나를 반영한 새 날짜별 기록 (시각 순서대로 들어올 때만 사용)"""
+    emotion = event["emotion"]
+    if previous is None:
+        record = {
+            "date": event["timestamp"][:10],
+            "note": event["note"],
+            "emotion": emotion,
+            "color": event["color"],
+            "entries": 1,
+            "counts": {emotion: 1},
+            "first": event["timestamp"],
+            "last": event["timestamp"]
+        }
+    else:
+        record = dict(previous)
+        counts = dict(previous["counts"])
+        counts[emotion] = counts.get(emotion, 0) + 1
+        record["counts"] = counts
+        record["entries"] = previous["entries"] + 1
+        record["note"] = event["note"]
+        record["last"] = event["timestamp"]
+        # 같은 개수면 나중에 기록한 감정이 대표 감정
+        if counts[emotion] >= counts.get(previous["emotion"], 0):
+            record["emotion"] = emotion
+            record["color"] = event["color"]
+
+    if event.get("weather"):
+        record["weather"] = event["weather"]
+    return record
+
+def rollup_day(events):
+    """그날 기록 전체로 날짜별 기록을 다시 계산"""
+    record = None
+    for event in events:
+        record = rollup(record, event)
+    return record
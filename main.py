@@ -3,6 +3,15 @@ import os
 from datetime import datetime, timedelta
 import calendar
 
+import entries
+import perf
+import query
+import render
+import search
+import storage
+import sync
+import textcharts
+
 # 날씨 모듈 추가
 try:
     import weather
@@ -31,48 +40,72 @@ def load_emotion_map():
             "설렘": "#FF69B4"
         }
 
-def load_records():
-    os.makedirs("data", exist_ok=True)
-    
-    try:
-        if os.path.exists(DATA_FILE) and os.path.getsize(DATA_FILE) > 0:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        else:
-            # 파일이 비어있거나 존재하지 않으면 빈 배열 반환
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump([], f)
-            return []
-    except json.JSONDecodeError:
-        print("기록 파일이 손상되었습니다. 새로운 파일을 생성합니다.")
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-        return []
+@perf.timed()
+def load_records(start=None, end=None):
+    """기록 로드 (start~end 기간에 걸치는 지난 해 아카이브 포함, 조건 조회는 query.query 사용)"""
+    return storage.with_archives(storage.load_hot_records(), start, end)
 
+def has_records():
+    """기록이 하나라도 있는지 (올해 기록은 query의 캐시를 재사용하므로 이어지는 조회에서 다시 읽지 않음)"""
+    return bool(query.hot_records()) or storage.has_archives()
+
+@perf.timed()
 def save_record(entry):
-    records = load_records()
+    # 검색 색인이 현재 기록 파일과 맞는지 먼저 확인 (쓰고 나면 한 건만 갱신)
+    search.load_index()
+    _write_record(entry)
+    search.update_index(entry)
+
+def _write_record(entry):
+    """날짜별 기록 저장 (검색 색인은 호출한 쪽에서 갱신)"""
+    # 이미 아카이브된 연도의 기록이면 아카이브에 반영
+    if storage.is_archived(entry["date"][:4]):
+        storage.save_to_archive(entry)
+        return
     
     # 같은 날짜 기록이 있으면 업데이트
-    for i, record in enumerate(records):
-        if record["date"] == entry["date"]:
-            # 기존 날씨 정보 보존
-            if "weather" in record and "weather" not in entry:
-                entry["weather"] = record["weather"]
-            records[i] = entry
-            break
-    else:
-        # 없으면 추가
-        records.append(entry)
+    records = storage.merge_record(storage.load_hot_records(), entry)
+    
+    # 지난 해 기록은 연도별 아카이브로 이동
+    records = storage.roll_over(records)
+    
+    # 아카이브를 쓴 뒤 끊겨도 기록 파일이 잘리지 않도록 임시 파일에 쓰고 교체
+    storage.save_hot_records(records, DATA_FILE)
+    
+    if perf.ENABLED:
+        perf.count("records.bytes_written", os.path.getsize(DATA_FILE))
+
+@perf.timed()
+def record_entry(event):
+    """시각이 있는 감정 기록을 로그에 추가하고 그날의 집계를 갱신"""
+    date = event["timestamp"][:10]
+    previous = next(iter(query.query(start=date, end=date)), None)
+    
+    # 검색 색인이 현재 로그와 맞는지 먼저 확인 (파일을 모두 쓴 뒤 한 번만 갱신)
+    search.load_index()
+    new_events = []
+    
+    # 시각 정보가 없는 예전 형식 기록은 그날 0시 기록으로 로그에 옮김
+    if previous is not None and "entries" not in previous:
+        legacy_event = entries.to_event(previous)
+        entries.append_entry(legacy_event)
+        new_events.append(legacy_event)
+        previous = entries.rollup(None, legacy_event)
     
-    # 날짜 기준으로 정렬
-    records.sort(key=lambda x: x["date"])
+    appended = entries.append_entry(event)
+    new_events.append(event)
+    if appended:
+        # 시각 순서대로 들어온 기록은 기존 집계에 한 건만 반영
+        record = entries.rollup(previous, event)
+    else:
+        record = entries.rollup_day(entries.load_entries(date))
     
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(records, f, ensure_ascii=False, indent=2)
+    _write_record(record)
+    search.update_index(*new_events)
+    return record
 
 def view_monthly_summary():
-    records = load_records()
-    if not records:
+    if not has_records():
         print("\n기록이 없습니다.")
         return
     
@@ -99,9 +132,8 @@ def view_monthly_summary():
         year = int(input("연도: "))
         month = int(input("월 (1-12): "))
     
-    # 해당 월의 기록만 필터링
-    month_prefix = f"{year}-{month:02d}-"
-    monthly_records = [r for r in records if r["date"].startswith(month_prefix)]
+    # 해당 월의 기록만 로드
+    monthly_records = query.query(start=f"{year}-{month:02d}-01", end=f"{year}-{month:02d}-31")
     
     if not monthly_records:
         print(f"\n{year}년 {month}월 기록이 없습니다.")
@@ -130,23 +162,21 @@ def view_monthly_summary():
                 else:
                     week_str += f"{day:2d}   "
         print(week_str)
+    
+    # 이번 달 감정 분포 (텍스트 막대)
+    monthly_counts = {}
+    for r in monthly_records:
+        monthly_counts[r["emotion"]] = monthly_counts.get(r["emotion"], 0) + 1
+    print(f"\n{month}월 감정 분포")
+    colors = emotion_map if textcharts.supports_color() else None
+    for line in textcharts.distribution_bars(monthly_counts, emotion_map.keys(), colors=colors):
+        print(line)
 
 def get_emotion_emoji(emotion):
-    emoji_map = {
-        "기쁨": "😊",
-        "슬픔": "😢",
-        "화남": "😠",
-        "불안": "😰",
-        "공허함": "😶",
-        "평온": "😌",
-        "지침": "😩",
-        "설렘": "😍"
-    }
-    return emoji_map.get(emotion, "❓")
+    return textcharts.emoji(emotion)
 
 def view_weekly_summary():
-    records = load_records()
-    if not records:
+    if not has_records():
         print("\n기록이 없습니다.")
         return
     
@@ -155,18 +185,17 @@ def view_weekly_summary():
     start_of_week = today - timedelta(days=today.weekday())
     end_of_week = start_of_week + timedelta(days=6)
     
-    # 이번 주 기록만 필터링
-    weekly_records = []
-    for r in records:
-        record_date = datetime.strptime(r["date"], "%Y-%m-%d").date()
-        if start_of_week <= record_date <= end_of_week:
-            weekly_records.append(r)
+    # 이번 주 기록만 로드 (연초 주간이면 지난 해 아카이브도 읽음)
+    weekly_records = query.query(start=start_of_week.isoformat(), end=end_of_week.isoformat())
     
     if not weekly_records:
         print("\n이번 주 기록이 없습니다.")
         return
     
     print(f"\n이번 주 감정 요약 ({start_of_week} ~ {end_of_week})")
+    for line in textcharts.week_strip(weekly_records, start_of_week):
+        print(line)
+    print()
     
     # 요일별 표시
     days = ["월", "화", "수", "목", "금", "토", "일"]
@@ -186,9 +215,151 @@ def view_weekly_summary():
                 if weather_emoji and weather_temp:
                     weather_info = f" | {weather_emoji} {weather_temp}°C"
             
-            print(f"{day} ({curr_date.day}일): {emoji} {day_record['emotion']}{weather_info} - {day_record['note']}")
+            count_info = ""
+            if day_record.get("entries", 1) > 1:
+                count_info = f" ({day_record['entries']}회 기록)"
+            
+            print(f"{day} ({curr_date.day}일): {emoji} {day_record['emotion']}{count_info}{weather_info} - {day_record['note']}")
         else:
             print(f"{day} ({curr_date.day}일): 기록 없음")
+    
+    # 최근 30일 흐름 (하루 한 칸)
+    recent_records = query.query(start=(today - timedelta(days=29)).isoformat(), end=today.isoformat())
+    print(f"\n최근 30일: {textcharts.sparkline(recent_records, today, 30)}")
+
+@perf.timed()
+def view_quick_trends():
+    """matplotlib 없이 터미널에서 보는 감정 추세 (분포, 30/90일 흐름, 이번 주)"""
+    hot_records = query.hot_records()
+    if not hot_records and not storage.has_archives():
+        print("\n기록이 없습니다.")
+        return
+    
+    emotion_map = load_emotion_map()
+    colors = emotion_map if textcharts.supports_color() else None
+    today = datetime.now().date()
+    recent_records = query.query(start=(today - timedelta(days=89)).isoformat(), end=today.isoformat())
+    
+    print("\n전체 감정 분포")
+    for line in textcharts.distribution_bars(storage.emotion_counts(hot_records), emotion_map.keys(), colors=colors):
+        print(line)
+    
+    summary = textcharts.recent_summary(recent_records, today, 30)
+    print("\n최근 30일" + (f" ({summary[0]}일 기록, 가장 많은 감정: {get_emotion_emoji(summary[1])} {summary[1]})" if summary else ""))
+    print(textcharts.sparkline(recent_records, today, 30))
+    
+    print("\n최근 90일")
+    if colors:
+        print(textcharts.sparkline(recent_records, today, 90, colors))
+    else:
+        # 색을 쓸 수 없으면 이모지로 30일씩 세 줄
+        for end in (today - timedelta(days=60), today - timedelta(days=30), today):
+            print(textcharts.sparkline(recent_records, end, 30))
+    
+    start_of_week = today - timedelta(days=today.weekday())
+    print(f"\n이번 주 ({start_of_week} ~ {start_of_week + timedelta(days=6)})")
+    for line in textcharts.week_strip(recent_records, start_of_week):
+        print(line)
+
+def search_notes():
+    text = input("\n검색어: ").strip()
+    if not text:
+        print("검색어를 입력해주세요.")
+        return
+    
+    print("기간을 입력하세요 (YYYY-MM-DD, 비워두면 전체)")
+    start = input("시작일: ").strip() or None
+    end = input("종료일: ").strip() or None
+    
+    try:
+        for date_str in (start, end):
+            if date_str:
+                datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        print("날짜 형식이 올바르지 않습니다.")
+        return
+    
+    results = search.search(text, start, end)
+    
+    if not results:
+        print(f"\n'{text}'이(가) 포함된 기록이 없습니다.")
+        return
+    
+    print(f"\n'{text}' 검색 결과 ({len(results)}건)")
+    for r in results:
+        emoji = get_emotion_emoji(r["emotion"])
+        weather_info = ""
+        if "weather" in r:
+            weather_emoji = r["weather"].get("emoji", "")
+            weather_temp = r["weather"].get("temp", "")
+            if weather_emoji and weather_temp != "":
+                weather_info = f" | {weather_emoji} {weather_temp}°C"
+        time_info = f" {r['time']}" if "time" in r else ""
+        print(f"{r['date']}{time_info}: {emoji} {r['emotion']}{weather_info} - {r['note']}")
+
+def find_records():
+    emotion_map = load_emotion_map()
+    print("\n조건을 입력하세요 (비워두면 조건 없음)")
+    start = input("시작일 (YYYY-MM-DD): ").strip() or None
+    end = input("종료일 (YYYY-MM-DD): ").strip() or None
+    
+    emotions = list(emotion_map.keys())
+    for i, emotion in enumerate(emotions, start=1):
+        print(f"{i}. {emotion} {get_emotion_emoji(emotion)}")
+    emotion_choice = input("감정 번호 (여러 개는 쉼표로 구분): ").strip()
+    weather_choice = input("날씨 (예: Rain, Clear, 여러 개는 쉼표로 구분): ").strip()
+    min_temp = input("최저 온도 (°C): ").strip()
+    max_temp = input("최고 온도 (°C): ").strip()
+    
+    try:
+        for date_str in (start, end):
+            if date_str:
+                datetime.strptime(date_str, "%Y-%m-%d")
+        selected = None
+        if emotion_choice:
+            numbers = [int(n) for n in emotion_choice.split(",")]
+            if not all(1 <= n <= len(emotions) for n in numbers):
+                raise ValueError(emotion_choice)
+            selected = [emotions[n - 1] for n in numbers]
+        weather_types = [w.strip().capitalize() for w in weather_choice.split(",")] if weather_choice else None
+        temp_between = None
+        if min_temp or max_temp:
+            temp_between = (float(min_temp) if min_temp else None, float(max_temp) if max_temp else None)
+    except ValueError:
+        print("입력 형식이 올바르지 않습니다.")
+        return
+    
+    results = query.query(start=start, end=end, emotions=selected,
+                          weather=weather_types, temp_between=temp_between)
+    
+    if not results:
+        print("\n조건에 맞는 기록이 없습니다.")
+        return
+    
+    print(f"\n조회 결과 ({len(results)}건)")
+    for r in results:
+        weather_info = ""
+        if "weather" in r and r["weather"]:
+            weather_info = f" | {r['weather'].get('emoji', '')} {r['weather'].get('temp', '')}°C"
+        print(f"{r['date']}: {get_emotion_emoji(r['emotion'])} {r['emotion']}{weather_info} - {r['note']}")
+
+def sync_data():
+    print("\n다른 기기의 데이터 폴더 경로를 입력하세요 (예: /Volumes/share/ETracker/data)")
+    other_dir = input("경로: ").strip()
+    if not other_dir or not os.path.isdir(other_dir):
+        print("폴더를 찾을 수 없습니다.")
+        return
+    
+    result = sync.sync(other_dir)
+    if not result["months"] and not result["weather_copied"]:
+        print("\n두 기기의 기록이 이미 같습니다.")
+        return
+    
+    print(f"\n✅ 동기화 완료 (다른 달 {len(result['months'])}개)")
+    if result["months"]:
+        print(f"달: {', '.join(result['months'])}")
+    print(f"이 기기 갱신: {result['local_updated']}개월, 상대 기기 갱신: {result['other_updated']}개월")
+    print(f"시각별 기록 복사: {result['events_copied']}건, 날씨 캐시 복사: {result['weather_copied']}건")
 
 def view_weather_info():
     if not WEATHER_ENABLED:
@@ -235,8 +406,7 @@ def view_weather_info():
         
         # 현재 날씨를 오늘의 감정 기록에 저장할지 물어보기
         today = datetime.now().strftime("%Y-%m-%d")
-        records = load_records()
-        today_record = next((r for r in records if r["date"] == today), None)
+        today_record = next(iter(query.query(start=today, end=today)), None)
         
         if today_record:
             save_choice = input("\n오늘의 감정 기록에 이 날씨 정보를 저장할까요? (y/n): ").strip().lower()
@@ -248,6 +418,10 @@ def view_weather_info():
         print("날씨 정보를 가져오는데 실패했습니다.")
 
 def run():
+    # 첫 차트가 빨리 뜨도록 matplotlib과 한글 폰트를 백그라운드에서 미리 준비 (ETRACKER_WARM_UP=1)
+    if render.WARM_UP:
+        render.warm_up_async()
+    
     while True:
         print("\n======= 마음기록기 =======")
         
@@ -266,7 +440,11 @@ def run():
         print("3. 월간 감정 요약 보기")
         print("4. 전체 감정 지도 보기")
         print("5. 날씨 정보 보기") # 새로운 메뉴 항목
-        print("6. 종료")
+        print("6. 기록 검색")
+        print("7. 조건으로 기록 찾기")
+        print("8. 다른 기기와 동기화")
+        print("9. 감정 추세 한눈에 보기 (텍스트)")
+        print("10. 종료")
         
         choice = input("\n선택: ").strip()
         
@@ -280,7 +458,10 @@ def run():
             try:
                 import visualize
                 records = load_records()
-                if records:
+                if len(records) > visualize.TIMELINE_THRESHOLD:
+                    # 기록이 많으면 보이는 구간만 그리는 스크롤 타임라인 사용
+                    visualize.draw_timeline(records)
+                elif records:
                     visualize.draw_emotion_map(records)
                 else:
                     print("\n기록이 없습니다.")
@@ -289,6 +470,14 @@ def run():
         elif choice == "5":
             view_weather_info()
         elif choice == "6":
+            search_notes()
+        elif choice == "7":
+            find_records()
+        elif choice == "8":
+            sync_data()
+        elif choice == "9":
+            view_quick_trends()
+        elif choice == "10":
             print("\n프로그램을 종료합니다.")
             break
         else:
@@ -318,7 +507,7 @@ def record_today():
     color = emotion_map[emotion]
 
     entry = {
-        "date": datetime.now().strftime("%Y-%m-%d"),
+        "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
         "note": note,
         "emotion": emotion,
         "color": color
@@ -334,8 +523,11 @@ def record_today():
         except Exception as e:
             print(f"날씨 정보를 가져오는 중 오류 발생: {e}")
 
-    save_record(entry)
-    print(f"\n✅ '{emotion}'으로 저장되었습니다. ({entry['date']})")
+    record = record_entry(entry)
+    date, time = entry["timestamp"].split("T")
+    print(f"\n✅ '{emotion}'으로 저장되었습니다. ({date} {time[:5]}, 오늘 {record['entries']}번째 기록)")
+    if record["entries"] > 1:
+        print(f"   오늘의 대표 감정: {get_emotion_emoji(record['emotion'])} {record['emotion']}")
 
 if __name__ == "__main__":
     run()
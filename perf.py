@@ -0,0 +1,159 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+# 성능 계측 설정
+# ETRACKER_PROFILE 환경 변수에 출력 파일 경로를 지정하면 계측이 켜집니다.
+#   ETRACKER_PROFILE=data/profile.json python main.py
+# ETRACKER_PROFILE_FORMAT=chrome 으로 지정하면 chrome://tracing (Perfetto) 형식으로 저장합니다.
+# 환경 변수가 없으면 timed()는 원래 함수를 그대로 돌려주므로 오버헤드가 거의 없습니다.
+PROFILE_FILE = os.environ.get("ETRACKER_PROFILE", "")
+PROFILE_FORMAT = os.environ.get("ETRACKER_PROFILE_FORMAT", "json").lower()
+ENABLED = bool(PROFILE_FILE)
+
+_lock = threading.Lock()
+_start = time.perf_counter()
+_timings = {}   # 이름 -> {"calls", "total", "max"}
+_counters = {}  # 이름 -> 누적 값
+_events = []    # chrome trace 이벤트
+_local = threading.local()  # 스레드별로 진행 중인 timed() 함수의 시작 시각 (이름 -> 목록)
+
+def _now_us():
+    return (time.perf_counter() - _start) * 1_000_000
+
+def _record_span(name, began, ended):
+    elapsed = ended - began
+    with _lock:
+        stat = _timings.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0})
+        stat["calls"] += 1
+        stat["total"] += elapsed
+        stat["max"] = max(stat["max"], elapsed)
+        _events.append({
+            "name": name,
+            "ph": "X",
+            "ts": (began - _start) * 1_000_000,
+            "dur": elapsed * 1_000_000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident()
+        })
+
+def _active_starts():
+    if not hasattr(_local, "starts"):
+        _local.starts = {}
+    return _local.starts
+
+def timed(name=None):
+    """함수 실행 시간을 기록하는 데코레이터 (비활성화 시 원래 함수 반환)"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            began = time.perf_counter()
+            starts = _active_starts().setdefault(span_name, [])
+            starts.append(began)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                starts.pop()
+                _record_span(span_name, began, time.perf_counter())
+        return wrapper
+    return decorator
+
+class span:
+    """with 블록의 실행 시간을 기록하는 컨텍스트 매니저"""
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if ENABLED:
+            self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if ENABLED:
+            _record_span(self.name, self.began, time.perf_counter())
+        return False
+
+def count(name, value=1):
+    """카운터 증가 (바이트 수, 캐시 적중/실패 등)"""
+    if not ENABLED:
+        return
+    with _lock:
+        total = _counters.get(name, 0) + value
+        _counters[name] = total
+        _events.append({
+            "name": name,
+            "ph": "C",
+            "ts": _now_us(),
+            "pid": os.getpid(),
+            "args": {"value": total}
+        })
+
+def count_artists(name, fig):
+    """figure에 그려진 artist 수와 차트 구성 시간을 기록 (plt.show() 직전에 호출)
+
+    같은 이름의 timed() 함수 안에서 호출하면 함수 시작부터 지금까지를 "{name}.build"로 기록합니다.
+    timed() 함수 전체 시간에는 plt.show()로 창이 열려 있던 시간이 포함되므로
+    matplotlib에 걸린 시간은 .build 항목으로 확인합니다.
+    """
+    if not ENABLED or fig is None:
+        return
+    starts = _active_starts().get(name)
+    if starts:
+        _record_span(f"{name}.build", starts[-1], time.perf_counter())
+    artists = sum(len(ax.get_children()) for ax in fig.axes)
+    count(f"{name}.artists", artists)
+    with _lock:
+        # 렌더 준비 완료 시점 (plt.show() 직전)
+        _events.append({
+            "name": f"{name}.ready",
+            "ph": "i",
+            "s": "p",
+            "ts": _now_us(),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"artists": artists}
+        })
+
+def snapshot():
+    """현재까지의 계측 결과를 dict로 반환"""
+    with _lock:
+        timings = {
+            name: {
+                "calls": stat["calls"],
+                "total_ms": round(stat["total"] * 1000, 3),
+                "avg_ms": round(stat["total"] * 1000 / stat["calls"], 3),
+                "max_ms": round(stat["max"] * 1000, 3)
+            }
+            for name, stat in _timings.items()
+        }
+        return {"timings": timings, "counters": dict(_counters)}
+
+def dump(path=None):
+    """계측 결과를 파일로 저장"""
+    path = path or PROFILE_FILE
+    if not path:
+        return
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if PROFILE_FORMAT == "chrome":
+        with _lock:
+            data = {"traceEvents": list(_events), "displayTimeUnit": "ms"}
+    else:
+        data = snapshot()
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,157 @@
+import bisect
+import heapq
+import os
+
+import perf
+import storage
+
+# 조건 조합 조회 API
+#   query(start="2024-01-01", emotions=["불안"], weather=["Rain"], temp_between=(None, 5))
+# 연도별 아카이브와 올해 기록 파일을 각각 하나의 구간(segment)으로 보고,
+# 구간마다 보조 색인(감정→위치, 날씨→위치, 정렬된 온도 배열)을 만들어 메모리에 캐시합니다.
+# 조건마다 후보 수를 어림해서 가장 적은 색인으로 후보를 뽑고, 나머지 조건은 후보에서 확인합니다.
+
+_segments = {}  # 구간 이름 -> (파일 stamp, _Segment)
+
+class _Segment:
+    """날짜순으로 정렬된 기록 목록과 보조 색인"""
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda x: x["date"])
+        self.dates = [r["date"] for r in self.records]
+        self.by_emotion = {}
+        self.by_weather = {}
+        self.with_weather = []
+        temps = []
+        for i, r in enumerate(self.records):
+            self.by_emotion.setdefault(r["emotion"], []).append(i)
+            weather = r.get("weather")
+            if weather:
+                self.with_weather.append(i)
+                self.by_weather.setdefault(weather.get("weather", "Unknown"), []).append(i)
+                temp = weather.get("temp")
+                if isinstance(temp, (int, float)):
+                    temps.append((temp, i))
+        temps.sort()
+        self.temps = [t for t, _ in temps]
+        self.temp_positions = [i for _, i in temps]
+
+    def date_range(self, start, end):
+        lo = bisect.bisect_left(self.dates, start) if start else 0
+        hi = bisect.bisect_right(self.dates, end) if end else len(self.dates)
+        return lo, hi
+
+    def temp_range(self, low, high):
+        lo = bisect.bisect_left(self.temps, low) if low is not None else 0
+        hi = bisect.bisect_right(self.temps, high) if high is not None else len(self.temps)
+        return lo, hi
+
+def _stamp(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _segment(name, path, load):
+    stamp = _stamp(path)
+    cached = _segments.get(name)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with perf.span("query.build_segment"):
+        segment = _Segment(load())
+    _segments[name] = (stamp, segment)
+    return segment
+
+def _segments_for(start, end):
+    """[start, end]에 걸치는 구간 목록 (날짜가 걸치지 않는 아카이브는 열지 않음)"""
+    segments = []
+    index = storage.load_archive_index()
+    for year in sorted(index):
+        summary = index[year]
+        if (end is None or summary["first"] <= end) and (start is None or summary["last"] >= start):
+            segments.append(_segment(year, storage.archive_path(year),
+                                     lambda year=year: storage.load_archive(year)))
+    segments.append(_segment("hot", storage.HOT_FILE, storage.load_hot_records))
+    return segments
+
+def _as_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+def _plan(segment, start, end, emotions, weather, has_weather, temp_between):
+    """가장 후보가 적은 색인을 골라 (이름, 후보 위치 iterable) 반환"""
+    lo, hi = segment.date_range(start, end)
+    plans = [("date", hi - lo, lambda: range(lo, hi))]
+
+    if emotions is not None:
+        emotion_lists = [segment.by_emotion.get(e, []) for e in emotions]
+        plans.append(("emotion", sum(map(len, emotion_lists)), lambda: heapq.merge(*emotion_lists)))
+    if weather is not None:
+        weather_lists = [segment.by_weather.get(w, []) for w in weather]
+        plans.append(("weather", sum(map(len, weather_lists)), lambda: heapq.merge(*weather_lists)))
+    elif has_weather:
+        plans.append(("has_weather", len(segment.with_weather), lambda: segment.with_weather))
+    if temp_between is not None:
+        t_lo, t_hi = segment.temp_range(*temp_between)
+        plans.append(("temp", t_hi - t_lo, lambda: sorted(segment.temp_positions[t_lo:t_hi])))
+
+    name, _, positions = min(plans, key=lambda plan: plan[1])
+    return name, positions()
+
+def _matches(record, start, end, emotions, weather, has_weather, temp_between):
+    date = record["date"]
+    if (start and date < start) or (end and date > end):
+        return False
+    if emotions is not None and record["emotion"] not in emotions:
+        return False
+
+    info = record.get("weather")
+    if (weather is not None or has_weather or temp_between is not None) and not info:
+        return False
+    if weather is not None and info.get("weather", "Unknown") not in weather:
+        return False
+    if temp_between is not None:
+        temp = info.get("temp")
+        low, high = temp_between
+        if not isinstance(temp, (int, float)):
+            return False
+        if (low is not None and temp < low) or (high is not None and temp > high):
+            return False
+    return True
+
+def hot_records():
+    """올해 기록 파일의 기록 목록 (캐시된 구간을 재사용하므로 파일이 그대로면 다시 읽지 않음)
+
+    캐시를 그대로 돌려주므로 읽기 전용으로만 사용하세요.
+    """
+    return _segment("hot", storage.HOT_FILE, storage.load_hot_records).records
+
+@perf.timed("query.query")
+def query(start=None, end=None, emotions=None, weather=None, temp_between=None, has_weather=False):
+    """조건에 맞는 기록을 날짜순으로 반환
+
+    start, end: "YYYY-MM-DD" 문자열 (포함 범위)
+    emotions: 감정 이름 또는 목록 (예: ["불안", "슬픔"])
+    weather: 날씨 종류 또는 목록 (예: ["Rain", "Drizzle"])
+    temp_between: (최저, 최고) 온도 (포함 범위, 한쪽은 None 가능)
+    has_weather: True면 날씨 정보가 있는 기록만
+    """
+    emotions = _as_set(emotions)
+    weather = _as_set(weather)
+    conditions = (start, end, emotions, weather, has_weather, temp_between)
+
+    results = []
+    for segment in _segments_for(start, end):
+        plan, positions = _plan(segment, *conditions)
+        perf.count(f"query.plan.{plan}")
+        for i in positions:
+            record = segment.records[i]
+            if _matches(record, *conditions):
+                # 캐시된 색인의 기록이 바뀌지 않도록 복사본을 반환
+                results.append(dict(record))
+
+    # 새해 첫 저장 전에는 올해 파일에 지난 해 기록이 남아 있을 수 있음 (대부분 이미 정렬됨)
+    results.sort(key=lambda x: x["date"])
+    return results
@@ -0,0 +1,127 @@
+import os
+import threading
+
+import perf
+
+# 차트 렌더링 준비 (한글 폰트, 차트별 figure 템플릿)
+# matplotlib은 import와 폰트 탐색에 시간이 오래 걸리므로
+# - 한글을 표시할 수 있는 폰트를 한 번만 찾아 rcParams에 설정하고
+# - 차트 종류별 figure/axes 구성을 템플릿으로 모아 두며
+# - 메뉴가 뜰 때 warm_up_async()로 백그라운드에서 미리 준비할 수 있습니다.
+#   (ETRACKER_WARM_UP=1 일 때만. 텍스트 화면만 쓰는 세션에서는 matplotlib을 불러오지 않음)
+# 이 모듈 자체는 matplotlib을 import하지 않으므로 main.py에서 가볍게 불러올 수 있습니다.
+
+WARM_UP = os.environ.get("ETRACKER_WARM_UP", "") not in ("", "0")
+
+# 한글 표시가 가능한 폰트 (앞에 있을수록 우선)
+FONT_CANDIDATES = [
+    "Malgun Gothic",       # Windows
+    "Apple SD Gothic Neo", # macOS
+    "AppleGothic",
+    "NanumGothic",
+    "NanumBarunGothic",
+    "Noto Sans CJK KR",
+    "Noto Sans KR",
+    "Source Han Sans KR",
+    "UnDotum",
+    "Baekmuk Gulim"
+]
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 차트 종류별 figure 템플릿 (plt.subplots / plt.figure 인자)
+TEMPLATES = {
+    "emotion_map": {"nrows": 2, "ncols": 1, "figsize": (10, 5), "sharex": True,
+                    "gridspec_kw": {"height_ratios": [3, 1]}},
+    "calendar": {"figsize": (10, 8)},
+    "distribution": {"figsize": (10, 6)},
+    "weather_emotion": {"nrows": 2, "ncols": 1, "figsize": (12, 10)},
+    "trends": {"nrows": 3, "ncols": 1, "figsize": (12, 10),
+               "gridspec_kw": {"height_ratios": [2, 2, 1]}},
+    "transitions": {"figsize": (8, 7)},
+    "year_heatmap": {"figsize": (14, 2.5)},
+    "timeline": {"figsize": (14, 3.5)}
+}
+
+_font = None
+_ready = False
+_lock = threading.Lock()
+_warm_thread = None
+
+def setup_fonts():
+    """한글 폰트를 찾아 rcParams에 설정 (한 번만 실행, 찾은 폰트 이름 반환)"""
+    global _font, _ready
+    with _lock:
+        if _ready:
+            return _font
+
+        with perf.span("render.setup_fonts"):
+            import matplotlib
+            from matplotlib import font_manager
+
+            available = {f.name for f in font_manager.fontManager.ttflist}
+            _font = next((name for name in FONT_CANDIDATES if name in available), None)
+            if _font:
+                matplotlib.rcParams["font.family"] = [_font] + list(matplotlib.rcParams["font.family"])
+            # 한글 폰트에는 유니코드 마이너스 기호가 없는 경우가 많음
+            matplotlib.rcParams["axes.unicode_minus"] = False
+
+        _ready = True
+        return _font
+
+@perf.timed("render.warm_up")
+def warm_up():
+    """폰트 설정 후 한글 텍스트를 한 번 그려 폰트/글리프 캐시를 채움
+
+    GUI 백엔드는 메인 스레드에서만 써야 하므로 pyplot 대신 Agg 캔버스를 사용합니다.
+    한글 폰트가 없으면 메뉴 중간에 글리프 경고가 찍히지 않도록 한글 없이 그립니다.
+    """
+    font = setup_fonts()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(2, 1))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if font:
+        ax.set_title("감정 지도")
+        ax.set_xticks(range(len(WEEKDAYS)))
+        ax.set_xticklabels(WEEKDAYS)
+        ax.text(0, 0, "기쁨 슬픔 화남 불안 공허함 평온 지침 설렘 0123456789°C")
+    else:
+        ax.text(0, 0, "0123456789°C")
+    fig.canvas.draw()
+
+def warm_up_async():
+    """백그라운드 스레드에서 warm_up 실행 (이미 시작했으면 무시)"""
+    global _warm_thread
+    if _warm_thread is None:
+        _warm_thread = threading.Thread(target=_warm_up_quietly, daemon=True)
+        _warm_thread.start()
+
+def _warm_up_quietly():
+    try:
+        warm_up()
+    except Exception:
+        pass  # 미리 준비하지 못해도 첫 차트에서 다시 시도함
+
+def _wait_for_warm_up():
+    if _warm_thread is not None and _warm_thread.is_alive():
+        with perf.span("render.wait_for_warm_up"):
+            _warm_thread.join()
+
+def subplots(chart, **overrides):
+    """차트 템플릿으로 figure와 axes 생성 (overrides로 figsize 등 변경)"""
+    _wait_for_warm_up()
+    setup_fonts()
+    import matplotlib.pyplot as plt
+    options = dict(TEMPLATES[chart], **overrides)
+    return plt.subplots(**options)
+
+def figure(chart, **overrides):
+    """차트 템플릿으로 빈 figure 생성"""
+    _wait_for_warm_up()
+    setup_fonts()
+    import matplotlib.pyplot as plt
+    options = dict(TEMPLATES[chart], **overrides)
+    return plt.figure(**options)
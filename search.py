@@ -0,0 +1,274 @@
+import bisect
+import json
+import os
+
+import entries
+import perf
+import query as record_query
+import storage
+
+# 한 줄 일기(note) 전문 검색용 역색인
+# 한국어는 띄어쓰기 단위로 자르면 조사가 붙어 검색이 잘 안 되므로
+# 단어 안에서 글자 2-gram(+1-gram)으로 색인합니다.
+# 시각별 기록(entries.jsonl)은 기록마다 시각("YYYY-MM-DDTHH:MM:SS")을 키로,
+# 시각 기록이 없는 예전 날짜별 기록은 날짜("YYYY-MM-DD")를 키로 색인하므로
+# 하루에 여러 번 남긴 한 줄 일기도 모두 검색됩니다.
+# 저장은 전체 색인(INDEX_FILE)과 변경 로그(INDEX_LOG_FILE)로 나눕니다.
+# 기록 하나를 남길 때는 변경 내용 한 줄만 로그에 덧붙이고,
+# 불러올 때 전체 색인에 로그를 이어서 적용합니다. 로그가 길어지면 전체 색인으로 합칩니다.
+INDEX_FILE = "data/note_index.json"
+INDEX_LOG_FILE = "data/note_index.log"
+INDEX_VERSION = 4
+COMPACT_LINES = 500  # 로그가 이 줄 수를 넘으면 불러올 때 전체 색인으로 합침
+
+_index = None  # 메모리에 올린 색인 (세션 동안 재사용)
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+def tokenize(text):
+    """텍스트를 글자 n-gram 집합으로 변환"""
+    grams = set()
+    for word in normalize(text).split():
+        grams.update(word)
+        grams.update(word[i:i+2] for i in range(len(word) - 1))
+    return grams
+
+def _query_grams(word):
+    # 두 글자 이상이면 2-gram만으로 충분히 좁혀짐
+    if len(word) == 1:
+        return {word}
+    return {word[i:i+2] for i in range(len(word) - 1)}
+
+def _doc(record):
+    doc = {"note": record.get("note", ""), "emotion": record.get("emotion", "")}
+    weather = record.get("weather")
+    if weather:
+        doc["weather"] = {
+            "weather": weather.get("weather", ""),
+            "emoji": weather.get("emoji", ""),
+            "temp": weather.get("temp", "")
+        }
+    return doc
+
+def _source_stamp():
+    # 올해 기록 파일, 아카이브 색인, 시각별 기록 로그 중 하나라도 바뀌면 색인을 다시 만듦
+    stamp = []
+    for path in (storage.HOT_FILE, storage.ARCHIVE_INDEX_FILE, entries.ENTRIES_FILE):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamp.append([stat.st_size, stat.st_mtime_ns])
+        else:
+            stamp.append(None)
+    return stamp
+
+def _free_key(index, key):
+    # 같은 시각에 남긴 기록이 여러 개면 "#2", "#3"을 붙여 구분
+    candidate, n = key, 1
+    while candidate in index["docs"]:
+        n += 1
+        candidate = f"{key}#{n}"
+    return candidate
+
+def _add(index, key, doc):
+    if key in index["docs"]:
+        _remove(index, key)
+    index["docs"][key] = doc
+    postings = index["postings"]
+    for gram in tokenize(doc["note"]):
+        keys = postings.setdefault(gram, [])
+        pos = bisect.bisect_left(keys, key)
+        if pos == len(keys) or keys[pos] != key:
+            keys.insert(pos, key)
+
+def _remove(index, key):
+    doc = index["docs"].pop(key, None)
+    if doc is None:
+        return
+    postings = index["postings"]
+    for gram in tokenize(doc["note"]):
+        keys = postings.get(gram)
+        if not keys:
+            continue
+        pos = bisect.bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            del keys[pos]
+        if not keys:
+            del postings[gram]
+
+def _apply(index, op):
+    if op[0] == "add":
+        _add(index, op[1], op[2])
+    else:
+        _remove(index, op[1])
+
+def _save(index):
+    """전체 색인을 쓰고 변경 로그를 비움 (재생성, 로그 합치기)"""
+    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+    tmp_file = INDEX_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({key: value for key, value in index.items() if key != "log_lines"}, f, ensure_ascii=False)
+    os.replace(tmp_file, INDEX_FILE)
+    # 여기서 끊겨도 남은 로그는 같은 결과로 다시 적용되므로 안전함
+    if os.path.exists(INDEX_LOG_FILE):
+        os.remove(INDEX_LOG_FILE)
+    perf.count("search.index_saves")
+
+def _append_log(ops, source):
+    """변경 내용과 적용 후의 파일 상태를 로그에 한 줄로 덧붙임"""
+    os.makedirs(os.path.dirname(INDEX_LOG_FILE), exist_ok=True)
+    line = json.dumps({"ops": ops, "source": source}, ensure_ascii=False)
+    with open(INDEX_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    perf.count("search.log_bytes_written", len(line.encode("utf-8")) + 1)
+
+def _load_saved():
+    """저장된 전체 색인에 변경 로그를 적용해 반환 (없거나 읽을 수 없으면 None)"""
+    if not os.path.exists(INDEX_FILE):
+        return None
+    try:
+        with open(INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            return None
+        lines = 0
+        if os.path.exists(INDEX_LOG_FILE):
+            with open(INDEX_LOG_FILE, "r", encoding="utf-8") as f:
+                for line in f:
+                    # 쓰다 끊긴 마지막 줄은 JSONDecodeError -> 재생성
+                    change = json.loads(line)
+                    for op in change["ops"]:
+                        _apply(index, op)
+                    index["source"] = change["source"]
+                    lines += 1
+    except json.JSONDecodeError:
+        return None
+    index["log_lines"] = lines
+    return index
+
+@perf.timed("search.rebuild_index")
+def rebuild_index(records=None):
+    """전체 기록으로 색인을 새로 생성 (시각별 기록이 있는 날은 기록마다 색인)"""
+    global _index
+    if records is None:
+        records = storage.with_archives(storage.load_hot_records())
+    events = entries.load_entries()
+    event_days = {event["timestamp"][:10] for event in events}
+
+    index = {"version": INDEX_VERSION, "docs": {}, "postings": {}, "source": _source_stamp()}
+    for record in records:
+        if record["date"] not in event_days:
+            _add(index, record["date"], _doc(record))
+    for event in events:
+        _add(index, _free_key(index, event["timestamp"]), _doc(event))
+
+    _save(index)
+    index["log_lines"] = 0
+    _index = index
+    return index
+
+def load_index():
+    """색인 로드 (없거나 기록 파일과 맞지 않으면 재생성)"""
+    global _index
+    stamp = _source_stamp()
+    if _index is not None and _index.get("source") == stamp:
+        return _index
+
+    index = _load_saved()
+    if index is None or index.get("source") != stamp:
+        return rebuild_index()
+
+    if index["log_lines"] > COMPACT_LINES:
+        _save(index)
+        index["log_lines"] = 0
+    _index = index
+    return index
+
+def update_index(*changed):
+    """기록 파일/로그를 모두 쓴 뒤 바뀐 기록만 색인에 반영 (로그에 한 줄 추가)
+
+    쓰기 전에 load_index()로 색인을 맞춰 두므로 여기서는 바뀐 기록만 다시 색인하면 됩니다.
+    - 시각별 기록(timestamp): 그 기록을 추가하고, 같은 날의 예전 날짜별 문서는 제거
+    - 시각 기록이 없는 날짜별 기록: 그 날짜 문서를 교체
+    - 시각별 기록의 날짜 집계(entries): 기록마다 이미 색인되어 있으므로 파일 상태만 갱신
+    """
+    if _index is None:
+        # 색인을 처음 만드는 경우 이미 쓴 파일에서 바뀐 기록까지 읽어 옴
+        rebuild_index()
+        return
+    index = _index
+    ops = []
+    for entry in changed:
+        if "timestamp" in entry:
+            ops.append(["remove", entry["timestamp"][:10]])
+            ops.append(["add", _free_key(index, entry["timestamp"]), _doc(entry)])
+        elif "entries" not in entry:
+            ops.append(["remove", entry["date"]])
+            ops.append(["add", entry["date"], _doc(entry)])
+        else:
+            continue
+        # 다음 기록의 키(_free_key)가 앞 기록을 반영한 상태에서 정해지도록 바로 적용
+        for op in ops[-2:]:
+            _apply(index, op)
+
+    index["source"] = _source_stamp()
+    _append_log(ops, index["source"])
+    index["log_lines"] += 1
+
+@perf.timed("search.search")
+def search(query, start=None, end=None):
+    """note에 query의 모든 단어가 포함된 기록을 시각순으로 반환
+
+    start, end는 "YYYY-MM-DD" 문자열 (포함 범위)
+    시각별 기록은 결과에 "time"("HH:MM")이 들어 있습니다.
+    """
+    words = normalize(query).split()
+    if not words:
+        return []
+
+    index = load_index()
+    postings = index["postings"]
+
+    # 가장 짧은 posting 목록부터 교집합
+    gram_lists = []
+    for word in words:
+        for gram in _query_grams(word):
+            dates = postings.get(gram)
+            if not dates:
+                return []
+            gram_lists.append(dates)
+    gram_lists.sort(key=len)
+
+    first = gram_lists[0]
+    lo = bisect.bisect_left(first, start) if start else 0
+    # 키는 "YYYY-MM-DD" 또는 "YYYY-MM-DDTHH:MM:SS(#n)"이므로 "T~"를 붙이면 그날 끝까지 포함
+    hi = bisect.bisect_right(first, end + "T~") if end else len(first)
+    candidates = set(first[lo:hi])
+    for dates in gram_lists[1:]:
+        if not candidates:
+            break
+        candidates.intersection_update(dates)
+
+    # n-gram 교집합은 후보일 뿐이므로 실제 포함 여부 확인
+    results = []
+    for key in sorted(candidates):
+        doc = index["docs"][key]
+        note = normalize(doc["note"])
+        if all(word in note for word in words):
+            result = {"date": key[:10], "note": doc["note"], "emotion": doc["emotion"]}
+            if "T" in key:
+                result["time"] = key[11:16]
+            if "weather" in doc:
+                result["weather"] = doc["weather"]
+            results.append(result)
+    perf.count("search.candidates", len(candidates))
+
+    # 시각별 기록에 날씨가 없으면 그날 기록(나중에 저장한 날씨 포함)의 날씨를 사용
+    missing = [r for r in results if "weather" not in r]
+    if missing:
+        day_weather = {r["date"]: r["weather"] for r in
+                       record_query.query(start=missing[0]["date"], end=missing[-1]["date"], has_weather=True)}
+        for r in missing:
+            if r["date"] in day_weather:
+                r["weather"] = _doc({"weather": day_weather[r["date"]]})["weather"]
+    return results
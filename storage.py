@@ -0,0 +1,207 @@
+import gzip
+import json
+import os
+from datetime import datetime
+
+import perf
+
+# 계층형 기록 저장소
+# - 올해 기록: data/records.json (hot, 매번 읽고 씀)
+# - 지난 해 기록: data/archive/records-YYYY.json.gz (cold, 연도별 압축 파일)
+# - data/archive/index.json: 연도별 파일 이름, 날짜 범위, 감정별 개수
+# 기간을 지정한 조회는 그 기간에 걸치는 아카이브만 엽니다.
+HOT_FILE = "data/records.json"
+ARCHIVE_DIR = "data/archive"
+ARCHIVE_INDEX_FILE = os.path.join(ARCHIVE_DIR, "index.json")
+
+def merge_record(records, entry):
+    """같은 날짜 기록이 있으면 교체(기존 날씨 정보는 보존), 없으면 추가한 뒤 날짜순 정렬"""
+    for i, record in enumerate(records):
+        if record["date"] == entry["date"]:
+            # 기존 날씨 정보 보존
+            if "weather" in record and "weather" not in entry:
+                entry["weather"] = record["weather"]
+            records[i] = entry
+            break
+    else:
+        # 없으면 추가
+        records.append(entry)
+
+    # 날짜 기준으로 정렬
+    records.sort(key=lambda x: x["date"])
+    return records
+
+def load_hot_records():
+    """올해 기록 파일 읽기 (파일이 없거나 손상되었으면 빈 목록)"""
+    if not os.path.exists(HOT_FILE) or os.path.getsize(HOT_FILE) == 0:
+        return []
+    if perf.ENABLED:
+        perf.count("records.bytes_read", os.path.getsize(HOT_FILE))
+    try:
+        with open(HOT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return []
+
+def save_hot_records(records, path=HOT_FILE):
+    """올해 기록 파일 쓰기 (임시 파일에 쓴 뒤 교체하므로 중간에 끊겨도 이전 파일이 남음)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, path)
+
+# 아카이브 함수들은 archive_dir로 다른 데이터 폴더(동기화 대상 등)도 다룰 수 있습니다.
+def load_archive_index(archive_dir=ARCHIVE_DIR):
+    """아카이브 색인 로드 ({연도: {file, first, last, count, emotions}})"""
+    index_file = os.path.join(archive_dir, "index.json")
+    if not os.path.exists(index_file):
+        return {}
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print("아카이브 색인이 손상되었습니다. 아카이브 파일로 다시 만듭니다.")
+        return rebuild_archive_index(archive_dir)
+
+def save_archive_index(index, archive_dir=ARCHIVE_DIR):
+    os.makedirs(archive_dir, exist_ok=True)
+    index_file = os.path.join(archive_dir, "index.json")
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, index_file)
+
+def has_archives():
+    return bool(load_archive_index())
+
+def archive_path(year, archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, _archive_file(year))
+
+def _archive_file(year):
+    return f"records-{year}.json.gz"
+
+@perf.timed("storage.load_archive")
+def load_archive(year, archive_dir=ARCHIVE_DIR):
+    """연도별 아카이브의 기록 목록"""
+    path = archive_path(year, archive_dir)
+    if not os.path.exists(path):
+        return []
+    if perf.ENABLED:
+        perf.count("archive.bytes_read", os.path.getsize(path))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+def _summary(year, records):
+    emotions = {}
+    for r in records:
+        emotions[r["emotion"]] = emotions.get(r["emotion"], 0) + 1
+    return {
+        "file": _archive_file(year),
+        "first": records[0]["date"],
+        "last": records[-1]["date"],
+        "count": len(records),
+        "emotions": emotions
+    }
+
+def write_archive(year, records, index=None, archive_dir=ARCHIVE_DIR):
+    """연도별 아카이브를 새로 씀 (기존 파일은 수정하지 않고 통째로 교체)"""
+    os.makedirs(archive_dir, exist_ok=True)
+    records = sorted(records, key=lambda x: x["date"])
+    path = archive_path(year, archive_dir)
+    tmp_file = path + ".tmp"
+    with gzip.open(tmp_file, "wt", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+    if perf.ENABLED:
+        perf.count("archive.bytes_written", os.path.getsize(path))
+
+    if index is None:
+        index = load_archive_index(archive_dir)
+    index[str(year)] = _summary(year, records)
+    save_archive_index(index, archive_dir)
+    return index
+
+def rebuild_archive_index(archive_dir=ARCHIVE_DIR):
+    """아카이브 파일들로 색인을 다시 생성"""
+    index = {}
+    if os.path.isdir(archive_dir):
+        for name in sorted(os.listdir(archive_dir)):
+            if name.startswith("records-") and name.endswith(".json.gz"):
+                year = name[len("records-"):-len(".json.gz")]
+                records = load_archive(year, archive_dir)
+                if records:
+                    index[year] = _summary(year, records)
+    save_archive_index(index, archive_dir)
+    return index
+
+def is_archived(year):
+    return str(year) in load_archive_index()
+
+def save_to_archive(entry):
+    """지난 해 날짜의 기록을 해당 연도 아카이브에 반영"""
+    year = entry["date"][:4]
+    records = merge_record(load_archive(year), entry)
+    write_archive(year, records)
+
+def roll_over(records, current_year=None):
+    """올해가 아닌 기록을 연도별 아카이브로 옮기고 올해 기록만 반환"""
+    current_year = str(current_year or datetime.now().year)
+    hot = [r for r in records if r["date"][:4] >= current_year]
+    if len(hot) == len(records):
+        return records
+
+    by_year = {}
+    for r in records:
+        year = r["date"][:4]
+        if year < current_year:
+            by_year.setdefault(year, []).append(r)
+
+    index = load_archive_index()
+    for year, year_records in by_year.items():
+        if year in index:
+            archived = load_archive(year)
+            for r in year_records:
+                merge_record(archived, r)
+            year_records = archived
+        index = write_archive(year, year_records, index)
+    return hot
+
+def _overlaps(summary, start, end):
+    return (end is None or summary["first"] <= end) and (start is None or summary["last"] >= start)
+
+def with_archives(hot_records, start=None, end=None):
+    """hot 기록에 [start, end] 기간에 걸치는 아카이브 기록을 합쳐 날짜순으로 반환
+
+    start, end는 "YYYY-MM-DD" 문자열 (포함 범위, None이면 제한 없음)
+    """
+    records = []
+    index = load_archive_index()
+    for year in sorted(index):
+        if _overlaps(index[year], start, end):
+            records.extend(load_archive(year))
+
+    if records:
+        records.extend(hot_records)
+        records.sort(key=lambda x: x["date"])
+    else:
+        records = list(hot_records)
+
+    if start is not None or end is not None:
+        records = [r for r in records
+                   if (start is None or r["date"] >= start) and (end is None or r["date"] <= end)]
+    return records
+
+def emotion_counts(hot_records):
+    """전체 기간 감정별 개수 (아카이브는 색인의 집계만 사용)"""
+    counts = {}
+    index = load_archive_index()
+    for summary in index.values():
+        for emotion, count in summary["emotions"].items():
+            counts[emotion] = counts.get(emotion, 0) + count
+    for r in hot_records:
+        # roll over 전이라 hot에 남아 있는 지난 해 기록은 아카이브에 없을 때만 셈
+        if r["date"][:4] not in index:
+            counts[r["emotion"]] = counts.get(r["emotion"], 0) + 1
+    return counts
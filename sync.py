@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import sys
+
+import entries
+import perf
+import storage
+
+# 여러 기기 사이의 기록 동기화
+# 데이터 폴더마다 월별 기록의 해시로 머클 트리(월 → 연 → 루트)를 만들어 manifest.json에 저장하고,
+# 두 폴더의 manifest를 루트부터 비교해서 내용이 다른 달만 읽고 합쳐서 양쪽에 씁니다.
+# 원본 파일(올해 기록, 연도별 아카이브)이 바뀌지 않았으면 저장된 해시를 그대로 사용하므로
+# 변경이 없는 아카이브는 열지 않습니다.
+#
+# 데이터 폴더 구성 (기본: data)
+#   records.json, archive/, entries.jsonl, weather_cache.json, manifest.json
+LOCAL_DATA_DIR = "data"
+HOT_NAME = "records.json"
+
+def _hot_file(data_dir):
+    return os.path.join(data_dir, HOT_NAME)
+
+def _archive_dir(data_dir):
+    return os.path.join(data_dir, "archive")
+
+def _stamp(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _canonical(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+def _month_hash(records):
+    return _hash(_canonical(sorted(records, key=lambda x: x["date"])))
+
+def _by_month(records):
+    months = {}
+    for r in records:
+        months.setdefault(r["date"][:7], []).append(r)
+    return months
+
+def _load_hot(data_dir):
+    path = _hot_file(data_dir)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print(f"{path} 파일이 손상되어 빈 기록으로 취급합니다.")
+        return []
+
+def _save_hot(data_dir, records):
+    records.sort(key=lambda x: x["date"])
+    # 다른 기기 폴더는 주로 공유 폴더이므로 중간에 끊겨도 파일이 잘리지 않게 교체 방식으로 씀
+    storage.save_hot_records(records, _hot_file(data_dir))
+
+def _sources(data_dir):
+    """(이름, 파일 경로, 로더) 목록: 올해 기록 파일 + 연도별 아카이브"""
+    archive_dir = _archive_dir(data_dir)
+    sources = [(HOT_NAME, _hot_file(data_dir), lambda: _load_hot(data_dir))]
+    for year in sorted(storage.load_archive_index(archive_dir)):
+        sources.append((f"archive/{year}", storage.archive_path(year, archive_dir),
+                        lambda year=year: storage.load_archive(year, archive_dir)))
+    return sources
+
+@perf.timed("sync.build_manifest")
+def build_manifest(data_dir=LOCAL_DATA_DIR):
+    """데이터 폴더의 머클 manifest 생성 (바뀌지 않은 원본 파일은 이전 해시 재사용)"""
+    manifest_file = os.path.join(data_dir, "manifest.json")
+    cached = {}
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                cached = json.load(f).get("sources", {})
+        except json.JSONDecodeError:
+            cached = {}
+
+    sources = {}
+    for name, path, load in _sources(data_dir):
+        stamp = _stamp(path)
+        if name in cached and cached[name]["stamp"] == stamp:
+            sources[name] = cached[name]
+            continue
+        months = _by_month(load())
+        sources[name] = {
+            "stamp": stamp,
+            "months": {month: _month_hash(records) for month, records in months.items()}
+        }
+
+    # 같은 달이 두 파일에 나뉘어 있으면(새해 첫 저장 전) 두 해시를 합쳐서 사용
+    month_hashes = {}
+    for name in sorted(sources):
+        for month, digest in sources[name]["months"].items():
+            month_hashes[month] = _hash(month_hashes[month] + digest) if month in month_hashes else digest
+
+    years = {}
+    for month in sorted(month_hashes):
+        years.setdefault(month[:4], {})[month] = month_hashes[month]
+    tree = {
+        year: {"hash": _hash("".join(f"{m}:{h}" for m, h in sorted(months.items()))), "months": months}
+        for year, months in years.items()
+    }
+    manifest = {
+        "root": _hash("".join(f"{y}:{node['hash']}" for y, node in sorted(tree.items()))),
+        "years": tree,
+        "sources": sources
+    }
+
+    os.makedirs(data_dir, exist_ok=True)
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+def diff_manifests(a, b):
+    """두 manifest에서 내용이 다른 달 목록 (루트 → 연 → 월 순으로 내려가며 비교)"""
+    if a["root"] == b["root"]:
+        return []
+    months = []
+    for year in sorted(set(a["years"]) | set(b["years"])):
+        node_a, node_b = a["years"].get(year), b["years"].get(year)
+        if node_a and node_b and node_a["hash"] == node_b["hash"]:
+            continue
+        months_a = node_a["months"] if node_a else {}
+        months_b = node_b["months"] if node_b else {}
+        for month in sorted(set(months_a) | set(months_b)):
+            if months_a.get(month) != months_b.get(month):
+                months.append(month)
+    return months
+
+def _load_months(data_dir, manifest, months):
+    """지정한 달이 들어 있는 원본 파일만 열어 그 달의 기록을 반환"""
+    wanted = set(months)
+    sources = {name: load for name, _, load in _sources(data_dir)}
+    records = []
+    for name, source in manifest["sources"].items():
+        if wanted & set(source["months"]) and name in sources:
+            records.extend(r for r in sources[name]() if r["date"][:7] in wanted)
+    return records
+
+def _write_months(data_dir, months, records):
+    """지정한 달의 기록을 records로 교체 (아카이브된 연도는 아카이브, 나머지는 올해 기록 파일)"""
+    archive_dir = _archive_dir(data_dir)
+    index = storage.load_archive_index(archive_dir)
+    by_year = {}
+    for month in months:
+        by_year.setdefault(month[:4], set()).add(month)
+
+    hot = None
+    for year, year_months in by_year.items():
+        replacement = [r for r in records if r["date"][:7] in year_months]
+        if year in index:
+            kept = [r for r in storage.load_archive(year, archive_dir) if r["date"][:7] not in year_months]
+            index = storage.write_archive(year, kept + replacement, index, archive_dir)
+        else:
+            if hot is None:
+                hot = _load_hot(data_dir)
+            hot = [r for r in hot if r["date"][:7] not in year_months] + replacement
+    if hot is not None:
+        _save_hot(data_dir, hot)
+
+def _event_key(event):
+    return (event["timestamp"], _canonical(event))
+
+def _load_events(data_dir):
+    path = os.path.join(data_dir, os.path.basename(entries.ENTRIES_FILE))
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _add_events(data_dir, new_events):
+    """다른 기기에만 있던 기록을 로그에 추가 (시각 순 정렬 유지)"""
+    if not new_events:
+        return
+    events = sorted(_load_events(data_dir) + new_events, key=_event_key)
+    path = os.path.join(data_dir, os.path.basename(entries.ENTRIES_FILE))
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    os.replace(tmp_file, path)
+
+def merge_day(local, remote, events):
+    """같은 날짜의 두 기록을 합침
+
+    시각별 기록이 있으면 양쪽 기록을 모두 모아 그날 집계를 다시 계산하고,
+    save_record와 같이 새 기록에 날씨가 없으면 기존 날씨 정보를 보존합니다.
+    """
+    if local is None or remote is None or local == remote:
+        return local or remote
+
+    merged = entries.rollup_day(sorted(events, key=_event_key))
+    if merged is None:
+        # 양쪽 다 예전 형식이거나 로그가 없으면 한쪽을 고름
+        # (마지막 기록 시각이 늦은 쪽, 같으면 어느 기기에서든 같은 쪽)
+        merged = dict(max(local, remote, key=lambda r: (r.get("last", ""), _canonical(r))))
+    for record in (local, remote):
+        if "weather" in record and "weather" not in merged:
+            merged["weather"] = record["weather"]
+    return merged
+
+@perf.timed("sync.sync")
+def sync(other_dir, local_dir=LOCAL_DATA_DIR):
+    """두 데이터 폴더를 동기화하고 통계를 반환"""
+    local_manifest = build_manifest(local_dir)
+    other_manifest = build_manifest(other_dir)
+    months = diff_manifests(local_manifest, other_manifest)
+    stats = {"months": months, "local_updated": 0, "other_updated": 0, "events_copied": 0}
+
+    if months:
+        wanted = set(months)
+        local_by_date = {r["date"]: r for r in _load_months(local_dir, local_manifest, months)}
+        other_by_date = {r["date"]: r for r in _load_months(other_dir, other_manifest, months)}
+
+        # 해당 달의 시각별 기록을 합집합으로 모음
+        local_events = [e for e in _load_events(local_dir) if e["timestamp"][:7] in wanted]
+        other_events = [e for e in _load_events(other_dir) if e["timestamp"][:7] in wanted]
+        local_keys = {_event_key(e) for e in local_events}
+        other_keys = {_event_key(e) for e in other_events}
+        events_by_date = {}
+        for event in local_events + [e for e in other_events if _event_key(e) not in local_keys]:
+            events_by_date.setdefault(event["timestamp"][:10], []).append(event)
+
+        merged = []
+        for date in sorted(set(local_by_date) | set(other_by_date)):
+            local, other = local_by_date.get(date), other_by_date.get(date)
+            day_events = events_by_date.setdefault(date, [])
+            if (local is not None and other is not None and local != other
+                    and ("entries" in local or "entries" in other)):
+                # 한쪽만 예전 형식(시각 없음)이면 그날 0시 기록으로 바꿔 함께 합침
+                for record in (local, other):
+                    if "entries" not in record:
+                        day_events.append(entries.to_event(record))
+            merged.append(merge_day(local, other, day_events))
+
+        all_events = [e for day in events_by_date.values() for e in day]
+        missing_local = [e for e in all_events if _event_key(e) not in local_keys]
+        missing_other = [e for e in all_events if _event_key(e) not in other_keys]
+        _add_events(local_dir, missing_local)
+        _add_events(other_dir, missing_other)
+        stats["events_copied"] = len(missing_local) + len(missing_other)
+
+        # 합친 결과와 해시가 다른 쪽에만 씀
+        merged_by_month = _by_month(merged)
+        for data_dir, manifest, key in ((local_dir, local_manifest, "local_updated"),
+                                        (other_dir, other_manifest, "other_updated")):
+            changed = [m for m in months
+                       if manifest["years"].get(m[:4], {}).get("months", {}).get(m)
+                       != _month_hash(merged_by_month.get(m, []))]
+            if changed:
+                _write_months(data_dir, changed, merged)
+                stats[key] = len(changed)
+
+    stats["weather_copied"] = _sync_weather_cache(local_dir, other_dir)
+    return stats
+
+def _sync_weather_cache(local_dir, other_dir):
+    """날씨 캐시는 키(도시_국가_날짜) 단위로 합집합 (같은 키는 기존 값 유지)"""
+    caches = []
+    for data_dir in (local_dir, other_dir):
+        path = os.path.join(data_dir, "weather_cache.json")
+        cache = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            except json.JSONDecodeError:
+                cache = {}
+        caches.append((path, cache))
+
+    copied = 0
+    (path_a, cache_a), (path_b, cache_b) = caches
+    for path, cache, other in ((path_a, cache_a, cache_b), (path_b, cache_b, cache_a)):
+        missing = {key: value for key, value in other.items() if key not in cache}
+        if missing:
+            cache.update(missing)
+            tmp_file = path + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, path)
+            copied += len(missing)
+    return copied
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("사용법: python sync.py <다른 데이터 폴더 경로>")
+        sys.exit(1)
+    result = sync(sys.argv[1])
+    print(f"다른 달: {len(result['months'])}개, 이 기기 갱신: {result['local_updated']}개월, "
+          f"상대 기기 갱신: {result['other_updated']}개월, 시각별 기록 복사: {result['events_copied']}건, "
+          f"날씨 캐시 복사: {result['weather_copied']}건")
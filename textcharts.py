@@ -0,0 +1,146 @@
+import os
+import sys
+import unicodedata
+from datetime import date, timedelta
+
+# 터미널용 텍스트 차트 (표준 라이브러리만 사용)
+# matplotlib/numpy를 불러오지 않으므로 메뉴에서 바로 추세를 확인할 수 있습니다.
+# - distribution_bars: 감정별 개수 가로 막대
+# - sparkline: 최근 n일 감정을 하루 한 칸으로 (이모지 또는 감정 색 블록)
+# - week_strip: 요일별 감정과 날씨/기온을 나란히 보여주는 주간 띠
+
+EMOTION_EMOJI = {
+    "기쁨": "😊",
+    "슬픔": "😢",
+    "화남": "😠",
+    "불안": "😰",
+    "공허함": "😶",
+    "평온": "😌",
+    "지침": "😩",
+    "설렘": "😍"
+}
+UNKNOWN_EMOJI = "❓"
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+BLOCKS = " ▏▎▍▌▋▊▉█"  # 1/8 칸 단위 막대
+EMPTY_DAY = "·"        # 기록이 없는 날
+
+def emoji(emotion):
+    return EMOTION_EMOJI.get(emotion, UNKNOWN_EMOJI)
+
+def display_width(text):
+    """터미널에서 차지하는 칸 수 (한글/이모지는 두 칸)"""
+    width = 0
+    for ch in text:
+        if ch == "\ufe0f":
+            width += 1  # 이모지 표시 선택자: 앞 글자(☀ 등)를 두 칸으로 표시
+            continue
+        if unicodedata.combining(ch):
+            continue
+        width += 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+    return width
+
+def pad(text, width):
+    return text + " " * max(width - display_width(text), 0)
+
+def supports_color(stream=None):
+    """ANSI 색을 쓸 수 있는 터미널인지 (NO_COLOR 환경 변수로 끌 수 있음)"""
+    stream = stream or sys.stdout
+    if os.environ.get("NO_COLOR"):
+        return False
+    return hasattr(stream, "isatty") and stream.isatty() and os.environ.get("TERM") != "dumb"
+
+def colorize(text, hex_color):
+    """24비트 ANSI 전경색 적용"""
+    hex_color = hex_color.lstrip("#")
+    if len(hex_color) != 6:
+        return text
+    r, g, b = (int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+    return f"\033[38;2;{r};{g};{b}m{text}\033[0m"
+
+def bar(value, total, width):
+    """value/total 비율만큼의 막대 (1/8 칸 단위)"""
+    if total <= 0:
+        return ""
+    eighths = round(value / total * width * 8)
+    full, rest = divmod(eighths, 8)
+    return "█" * full + (BLOCKS[rest] if rest else "")
+
+def distribution_bars(counts, order=None, width=24, colors=None):
+    """감정별 개수 가로 막대 (줄 목록, 가장 많은 감정이 막대 전체 길이)
+
+    order를 주면 그 순서대로, 아니면 많은 순으로 표시합니다.
+    colors({감정: "#RRGGBB"})를 주면 막대에 감정 색을 입힙니다.
+    """
+    emotions = [e for e in (order or []) if counts.get(e)]
+    emotions += sorted((e for e in counts if counts[e] and e not in emotions),
+                       key=lambda e: -counts[e])
+    if not emotions:
+        return []
+
+    total = sum(counts[e] for e in emotions)
+    largest = max(counts[e] for e in emotions)
+    label_width = max(display_width(e) for e in emotions)
+    count_width = len(str(largest))
+
+    lines = []
+    for e in emotions:
+        drawn = pad(bar(counts[e], largest, width), width)
+        if colors and e in colors:
+            drawn = colorize(drawn, colors[e])
+        lines.append(f"{emoji(e)} {pad(e, label_width)} {drawn} "
+                     f"{counts[e]:>{count_width}} {counts[e] / total:>4.0%}")
+    return lines
+
+def _by_date(records):
+    return {r["date"]: r for r in records}
+
+def sparkline(records, end, days, colors=None):
+    """end 날짜까지 최근 days일 감정을 하루 한 칸으로 표시한 한 줄
+
+    colors를 주면 감정 색 블록(한 칸), 아니면 감정 이모지(두 칸)를 사용합니다.
+    """
+    by_date = _by_date(records)
+    cells = []
+    for offset in range(days - 1, -1, -1):
+        record = by_date.get((end - timedelta(days=offset)).isoformat())
+        if record is None:
+            cells.append(EMPTY_DAY if colors else EMPTY_DAY + " ")
+        elif colors:
+            cells.append(colorize("█", colors.get(record["emotion"], "#CCCCCC")))
+        else:
+            cells.append(emoji(record["emotion"]))
+    return "".join(cells)
+
+def _weather_cell(record):
+    weather = (record or {}).get("weather") or {}
+    icon = weather.get("emoji", "")
+    temp = weather.get("temp")
+    if isinstance(temp, (int, float)):
+        return f"{icon}{round(temp)}°".strip()
+    return icon
+
+def week_strip(records, start_of_week, cell_width=6):
+    """월요일부터 7일간의 요일/날짜, 감정, 날씨를 세 줄로 표시"""
+    by_date = _by_date(records)
+    header, moods, weathers = [], [], []
+    for i, day in enumerate(WEEKDAYS):
+        current = start_of_week + timedelta(days=i)
+        record = by_date.get(current.isoformat())
+        header.append(pad(f"{day} {current.day}", cell_width))
+        moods.append(pad(emoji(record["emotion"]) if record else EMPTY_DAY, cell_width))
+        weathers.append(pad(_weather_cell(record), cell_width))
+    return ["".join(cells).rstrip() for cells in (header, moods, weathers)]
+
+def recent_summary(records, end=None, days=30):
+    """최근 days일 기록 수와 가장 많았던 감정 (기록이 없으면 None)"""
+    end = end or date.today()
+    first = (end - timedelta(days=days - 1)).isoformat()
+    counts = {}
+    for r in records:
+        if first <= r["date"] <= end.isoformat():
+            counts[r["emotion"]] = counts.get(r["emotion"], 0) + 1
+    if not counts:
+        return None
+    top = max(counts, key=counts.get)
+    return sum(counts.values()), top
@@ -0,0 +1,166 @@
+import numpy as np
+
+import perf
+
+# 전체 기록에 대한 감정 추세 분석
+# 감정을 정수 코드로 바꾼 뒤 일(day) 단위 배열 하나로 펼쳐서
+# cumsum / run-length encoding / bincount 로 계산합니다. (기록 수에 선형)
+
+MISSING = -1  # 기록이 없는 날
+
+def encode_records(records, emotions=None):
+    """기록을 일 단위 감정 코드 배열로 변환
+
+    반환값: (시작일 datetime64[D], 일별 감정 코드 배열, 감정 목록)
+    기록이 없는 날은 MISSING(-1), 같은 날짜가 여러 번 있으면 마지막 기록을 사용합니다.
+    """
+    emotions = list(emotions or [])
+    seen = set(emotions)
+    for r in records:
+        if r["emotion"] not in seen:
+            seen.add(r["emotion"])
+            emotions.append(r["emotion"])
+
+    if not records:
+        return None, np.empty(0, dtype=np.int64), emotions
+
+    lookup = {emotion: i for i, emotion in enumerate(emotions)}
+    dates = np.array([r["date"] for r in records], dtype="datetime64[D]")
+    codes = np.array([lookup[r["emotion"]] for r in records], dtype=np.int64)
+
+    start = dates.min()
+    offsets = (dates - start).astype(np.int64)
+    daily = np.full(offsets.max() + 1, MISSING, dtype=np.int64)
+    # 정렬되지 않은 입력도 마지막 기록이 이기도록 안정 정렬 후 대입
+    order = np.argsort(offsets, kind="stable")
+    daily[offsets[order]] = codes[order]
+    return start, daily, emotions
+
+def _one_hot(daily, k):
+    counts = np.zeros((len(daily), k), dtype=np.int64)
+    recorded = np.flatnonzero(daily >= 0)
+    counts[recorded, daily[recorded]] = 1
+    return counts
+
+def rolling_shares(daily, k, window):
+    """window일 이동 구간의 감정 비율 (n_days x k, 기록이 없는 구간은 nan)"""
+    counts = _one_hot(daily, k)
+    cum = np.vstack([np.zeros((1, k), dtype=np.int64), np.cumsum(counts, axis=0)])
+    ends = np.arange(1, len(daily) + 1)
+    begins = np.maximum(ends - window, 0)
+    window_counts = cum[ends] - cum[begins]
+    totals = window_counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, window_counts / totals, np.nan)
+
+def longest_streaks(daily, k):
+    """감정별 최장 연속 일수와 시작 위치 (k 길이 배열 두 개, 없으면 0 / -1)"""
+    lengths = np.zeros(k, dtype=np.int64)
+    starts = np.full(k, -1, dtype=np.int64)
+    if len(daily) == 0:
+        return lengths, starts
+
+    # run-length encoding
+    run_starts = np.flatnonzero(np.r_[True, daily[1:] != daily[:-1]])
+    run_lengths = np.diff(np.r_[run_starts, len(daily)])
+    run_codes = daily[run_starts]
+
+    keep = run_codes >= 0
+    run_starts, run_lengths, run_codes = run_starts[keep], run_lengths[keep], run_codes[keep]
+    if len(run_codes) == 0:
+        return lengths, starts
+
+    # 감정별로 가장 긴 run (같은 길이면 먼저 나온 run)
+    order = np.lexsort((run_starts, -run_lengths, run_codes))
+    sorted_codes = run_codes[order]
+    first = order[np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]]
+    lengths[run_codes[first]] = run_lengths[first]
+    starts[run_codes[first]] = run_starts[first]
+    return lengths, starts
+
+def transition_matrix(daily, k):
+    """연속된 두 날 사이의 감정 전이 횟수와 확률 (k x k)"""
+    prev, curr = daily[:-1], daily[1:]
+    valid = (prev >= 0) & (curr >= 0)
+    counts = np.bincount(prev[valid] * k + curr[valid], minlength=k * k).reshape(k, k)
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        probs = np.where(totals > 0, counts / totals, 0.0)
+    return counts, probs
+
+def dominant_bins(start, daily, k, unit):
+    """일별 감정 코드를 주('W', 월요일 시작) 또는 월('M') 단위로 묶어 대표 감정 계산
+
+    반환값: (구간 시작일 번호, 구간 길이(일), 대표 감정 코드, 감정별 개수 n_bins x k)
+    날짜 번호는 1970-01-01부터의 일수입니다. 기록이 없는 구간의 코드는 MISSING입니다.
+    """
+    day_numbers = start.astype(np.int64) + np.arange(len(daily))
+    if unit == "W":
+        # 1970-01-01은 목요일이므로 +3 하면 월요일 시작 주 번호
+        bins = (day_numbers + 3) // 7
+        first, last = bins[0], bins[-1]
+        bin_starts = np.arange(first, last + 1) * 7 - 3
+    else:
+        bins = (start + np.arange(len(daily))).astype("datetime64[M]").astype(np.int64)
+        first, last = bins[0], bins[-1]
+        bin_starts = np.arange(first, last + 2).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        bin_starts, month_end = bin_starts[:-1], bin_starts[-1]
+
+    n_bins = last - first + 1
+    recorded = daily >= 0
+    counts = np.bincount((bins[recorded] - first) * k + daily[recorded],
+                         minlength=n_bins * k).reshape(n_bins, k)
+    codes = np.argmax(counts, axis=1)
+    codes[counts.sum(axis=1) == 0] = MISSING
+    ends = np.r_[bin_starts[1:], bin_starts[-1] + 7 if unit == "W" else month_end]
+    return bin_starts, ends - bin_starts, codes, counts
+
+def build_pyramid(start, daily, k):
+    """일/주/월 단위 상세도(level of detail) 피라미드
+
+    {"day" | "week" | "month": (시작일 번호, 길이, 대표 감정 코드, 감정별 개수)}
+    기록이 없는 구간은 제외합니다.
+    """
+    levels = {}
+    day_numbers = start.astype(np.int64) + np.arange(len(daily))
+    recorded = daily >= 0
+    levels["day"] = (day_numbers[recorded], np.ones(recorded.sum(), dtype=np.int64),
+                     daily[recorded], _one_hot(daily, k)[recorded])
+    for name, unit in (("week", "W"), ("month", "M")):
+        starts, widths, codes, counts = dominant_bins(start, daily, k, unit)
+        keep = codes >= 0
+        levels[name] = (starts[keep], widths[keep], codes[keep], counts[keep])
+    return levels
+
+@perf.timed("trends.analyze_trends")
+def analyze_trends(records, emotions=None, windows=(7, 30)):
+    """추세 분석 결과를 dict로 반환"""
+    start, daily, emotions = encode_records(records, emotions)
+    k = len(emotions)
+    if start is None:
+        return {"emotions": emotions, "dates": np.empty(0, dtype="datetime64[D]"),
+                "rolling": {}, "streaks": {}, "transitions": np.zeros((k, k), dtype=np.int64),
+                "transition_probs": np.zeros((k, k))}
+
+    dates = start + np.arange(len(daily))
+    streak_lengths, streak_starts = longest_streaks(daily, k)
+    counts, probs = transition_matrix(daily, k)
+
+    streaks = {}
+    for i, emotion in enumerate(emotions):
+        if streak_lengths[i] > 0:
+            first_day = dates[streak_starts[i]]
+            streaks[emotion] = {
+                "length": int(streak_lengths[i]),
+                "start": str(first_day),
+                "end": str(first_day + (streak_lengths[i] - 1))
+            }
+
+    return {
+        "emotions": emotions,
+        "dates": dates,
+        "rolling": {w: rolling_shares(daily, k, w) for w in windows},
+        "streaks": streaks,
+        "transitions": counts,
+        "transition_probs": probs
+    }
@@ -2,21 +2,21 @@ import json
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import matplotlib.patches as mpatches
+from matplotlib.colors import to_rgb
 import calendar
 import numpy as np
-import os
 
-def load_records():
-    data_file = "data/records.json"
-    if not os.path.exists(data_file) or os.path.getsize(data_file) == 0:
-        return []
-    
-    try:
-        with open(data_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        print("기록 파일을 불러오는 중 오류가 발생했습니다.")
-        return []
+import bootstrap
+import perf
+import query
+import render
+import storage
+import trends
+
+@perf.timed("visualize.load_records")
+def load_records(start=None, end=None):
+    """기록 로드 (start~end 기간에 걸치는 지난 해 아카이브 포함, 조건 조회는 query.query 사용)"""
+    return storage.with_archives(storage.load_hot_records(), start, end)
 
 def load_emotion_map():
     map_file = "emotion_map.json"
@@ -36,6 +36,17 @@ def load_emotion_map():
             "설렘": "#FF69B4"
         }
 
+def period_range(period):
+    """기간 이름('all', 'month', 'week')을 (시작일, 종료일) 문자열로 변환"""
+    today = datetime.now().date()
+    if period == 'month':
+        return today.strftime("%Y-%m-01"), today.strftime("%Y-%m-31")
+    elif period == 'week':
+        start_of_week = today - timedelta(days=today.weekday())
+        return start_of_week.isoformat(), (start_of_week + timedelta(days=6)).isoformat()
+    return None, None
+
+@perf.timed()
 def draw_emotion_map(records, period='all'):
     if not records:
         print("표시할 기록이 없습니다.")
@@ -44,25 +55,14 @@ def draw_emotion_map(records, period='all'):
     filtered_records = records
     title_suffix = ""
     
-    # 기간별 필터링
-    if period == 'month':
-        # 이번 달 필터링
-        current_month = datetime.now().strftime("%Y-%m")
-        filtered_records = [r for r in records if r["date"].startswith(current_month)]
-        title_suffix = f" - {datetime.now().strftime('%Y년 %m월')}"
-    elif period == 'week':
-        # 이번 주 필터링
-        today = datetime.now().date()
-        start_of_week = today - timedelta(days=today.weekday())
-        end_of_week = start_of_week + timedelta(days=6)
-        
-        filtered_records = []
-        for r in records:
-            record_date = datetime.strptime(r["date"], "%Y-%m-%d").date()
-            if start_of_week <= record_date <= end_of_week:
-                filtered_records.append(r)
-        
-        title_suffix = f" - {start_of_week} ~ {end_of_week}"
+    # 기간별 필터링 (이미 query.query로 기간을 골라 넘긴 기록이면 그대로 통과)
+    if period in ('month', 'week'):
+        start, end = period_range(period)
+        filtered_records = [r for r in records if start <= r["date"] <= end]
+        if period == 'month':
+            title_suffix = f" - {datetime.now().strftime('%Y년 %m월')}"
+        else:
+            title_suffix = f" - {start} ~ {end}"
     
     if not filtered_records:
         print(f"선택한 기간({period})에 표시할 기록이 없습니다.")
@@ -89,8 +89,7 @@ def draw_emotion_map(records, period='all'):
     dates, colors, emotions, notes, weathers, temps = zip(*sorted_data)
 
     # 두 개의 서브플롯 생성 (감정 타임라인 + 온도 그래프)
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(max(10, len(dates)*0.5), 5), 
-                                  gridspec_kw={'height_ratios': [3, 1]}, sharex=True)
+    fig, (ax1, ax2) = render.subplots("emotion_map", figsize=(max(10, len(dates)*0.5), 5))
 
     # 감정 타임라인 그리기 (위쪽 서브플롯)
     for i, (date, color, note, weather) in enumerate(zip(dates, colors, notes, weathers)):
@@ -158,17 +157,20 @@ def draw_emotion_map(records, period='all'):
         # 온도 데이터가 없으면 숨기기
         ax2.set_visible(False)
         fig.set_size_inches(max(10, len(dates)*0.5), 3)
+        # sharex라서 위쪽 축의 눈금 라벨이 꺼져 있으므로 다시 켬
+        ax1.tick_params(labelbottom=True)
 
     # 감정 타임라인 설정
     ax1.set_xlim(0, len(dates))
     ax1.set_ylim(0, 1.3)  # 날씨 이모지 공간 확보
-    ax1.set_xticks(np.arange(len(dates)) + 0.4)
-    ax1.set_xticklabels([d.strftime("%m/%d") for d in dates], rotation=45)
     ax1.set_yticks([])
     
-    # 온도 그래프 설정
-    ax2.set_xticks(np.arange(len(dates)) + 0.4)
-    ax2.set_xticklabels([d.strftime("%m/%d") for d in dates], rotation=45)
+    # 날짜 눈금 (두 그래프가 x축을 공유하므로 한 번만 설정)
+    ax1.set_xticks(np.arange(len(dates)) + 0.4)
+    ax1.set_xticklabels([d.strftime("%m/%d") for d in dates])
+    # 라벨 회전은 축마다 따로이므로 라벨이 보이는 두 축 모두에 적용
+    for ax in (ax1, ax2):
+        ax.tick_params(axis="x", labelrotation=45)
 
     # 범례 생성 (중복 제거)
     unique_emotions = []
@@ -181,21 +183,17 @@ def draw_emotion_map(records, period='all'):
 
     ax1.set_title(f"감정 지도{title_suffix}")
     plt.tight_layout()
+    perf.count_artists("draw_emotion_map", plt.gcf())
     plt.show()
 
+@perf.timed()
 def draw_monthly_calendar(year=None, month=None):
     if year is None or month is None:
         now = datetime.now()
         year, month = now.year, now.month
     
-    records = load_records()
-    if not records:
-        print("표시할 기록이 없습니다.")
-        return
-    
-    # 해당 월의 기록만 필터링
-    month_prefix = f"{year}-{month:02d}-"
-    monthly_records = [r for r in records if r["date"].startswith(month_prefix)]
+    # 해당 월의 기록만 로드
+    monthly_records = query.query(start=f"{year}-{month:02d}-01", end=f"{year}-{month:02d}-31")
     
     if not monthly_records:
         print(f"{year}년 {month}월 기록이 없습니다.")
@@ -219,12 +217,12 @@ def draw_monthly_calendar(year=None, month=None):
                 date_to_weather[r["date"]] = f"{emoji} {temp}°C"
     
     # 그림 설정
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig, ax = render.subplots("calendar")
     ax.axis('tight')
     ax.axis('off')
     
     # 요일 헤더
-    weekdays = ["월", "화", "수", "목", "금", "토", "일"]
+    weekdays = render.WEEKDAYS
     
     # 표 생성
     the_table = plt.table(cellText=[[""] * 7 for _ in cal],
@@ -299,20 +297,17 @@ def draw_monthly_calendar(year=None, month=None):
     
     plt.title(f"{year}년 {month}월 감정 캘린더")
     plt.tight_layout()
+    perf.count_artists("draw_monthly_calendar", plt.gcf())
     plt.show()
 
+@perf.timed()
 def draw_emotion_distribution():
-    records = load_records()
-    if not records:
+    # 감정별 횟수 계산 (아카이브는 색인의 집계를 사용하므로 열지 않음)
+    emotion_counts = storage.emotion_counts(storage.load_hot_records())
+    if not emotion_counts:
         print("표시할 기록이 없습니다.")
         return
     
-    # 감정별 횟수 계산
-    emotion_counts = {}
-    for record in records:
-        emotion = record["emotion"]
-        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-    
     # 감정 맵 로드
     emotion_map = load_emotion_map()
     
@@ -321,7 +316,7 @@ def draw_emotion_distribution():
     counts = list(emotion_counts.values())
     colors = [emotion_map.get(emotion, "#CCCCCC") for emotion in emotions]
     
-    plt.figure(figsize=(10, 6))
+    render.figure("distribution")
     
     # 원형 그래프
     plt.subplot(1, 2, 1)
@@ -343,103 +338,363 @@ def draw_emotion_distribution():
                 ha='center', va='bottom')
     
     plt.tight_layout()
+    perf.count_artists("draw_emotion_distribution", plt.gcf())
     plt.show()
 
+@perf.timed()
 def analyze_weather_emotion():
-    """날씨와 감정의 상관관계 분석"""
-    records = load_records()
-    weather_records = [r for r in records if "weather" in r and r["weather"]]
+    """날씨/온도별 감정 확률과 95% 부트스트랩 신뢰구간"""
+    weather_records = query.query(has_weather=True)
     
     if not weather_records or len(weather_records) < 3:
         print("날씨 정보가 충분하지 않습니다. (최소 3개 이상 필요)")
         return
     
-    # 날씨별 감정 집계
-    weather_emotion_map = {}
+    # 감정 맵 로드해서 색상 가져오기 (기록에 나온 감정만, 감정 맵 순서대로)
+    emotion_map = load_emotion_map()
+    present = {record["emotion"] for record in weather_records}
+    result = bootstrap.weather_emotion_intervals(
+        weather_records, [emotion for emotion in emotion_map if emotion in present])
+    emotions = result["emotions"]
+    width = 0.8 / len(emotions)
     
-    for record in weather_records:
-        weather_main = record["weather"].get("weather", "Unknown")
-        temp = record["weather"].get("temp", 0)
-        emotion = record["emotion"]
-        
-        # 온도 구간 (5도 단위)
-        temp_range = f"{5 * (temp // 5)}-{5 * (temp // 5) + 5}"
-        
-        # 날씨별 집계
-        if weather_main not in weather_emotion_map:
-            weather_emotion_map[weather_main] = {}
-        
-        if emotion not in weather_emotion_map[weather_main]:
-            weather_emotion_map[weather_main][emotion] = 0
-        
-        weather_emotion_map[weather_main][emotion] += 1
-        
-        # 온도별 집계
-        key = f"온도 {temp_range}°C"
-        if key not in weather_emotion_map:
-            weather_emotion_map[key] = {}
+    # 그래프 생성
+    fig, axs = render.subplots("weather_emotion")
+    
+    for ax, key, title in ((axs[0], "weather", "날씨별 감정 확률"),
+                           (axs[1], "temperature", "온도별 감정 확률")):
+        group = result[key]
+        x_pos = np.arange(len(group["labels"]))
         
-        if emotion not in weather_emotion_map[key]:
-            weather_emotion_map[key][emotion] = 0
+        # 각 감정별 막대 + 신뢰구간 오차 막대
+        for i, emotion in enumerate(emotions):
+            p = group["p"][:, i]
+            errors = [p - group["lower"][:, i], group["upper"][:, i] - p]
+            ax.bar(x_pos + i * width - width * len(emotions) / 2 + width / 2,
+                   p,
+                   width=width,
+                   yerr=errors,
+                   capsize=2,
+                   error_kw={"elinewidth": 0.8, "alpha": 0.7},
+                   label=emotion,
+                   color=emotion_map.get(emotion, "#CCCCCC"))
         
-        weather_emotion_map[key][emotion] += 1
+        ax.set_title(f"{title} (95% 신뢰구간, 재표본 {bootstrap.RESAMPLES}회)")
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels([f"{label}\n({n}회)" for label, n in zip(group["labels"], group["n"])])
+        ax.set_ylim(0, 1)
+        ax.set_ylabel("확률")
+        ax.legend(ncol=min(len(emotions), 4), fontsize=8)
     
-    # 그래프 생성
-    fig, axs = plt.subplots(2, 1, figsize=(12, 10))
+    plt.tight_layout()
+    perf.count_artists("analyze_weather_emotion", plt.gcf())
+    plt.show()
+
+@perf.timed()
+def draw_emotion_trends():
+    """7일/30일 이동 감정 비율과 감정별 최장 연속 기록"""
+    records = load_records()
+    if not records:
+        print("표시할 기록이 없습니다.")
+        return
+    
+    emotion_map = load_emotion_map()
+    result = trends.analyze_trends(records, emotion_map.keys())
+    emotions = result["emotions"]
+    colors = [emotion_map.get(emotion, "#CCCCCC") for emotion in emotions]
+    dates = result["dates"].astype("datetime64[D]").astype(datetime)
+    
+    fig, axs = render.subplots("trends")
+    
+    # 1, 2. 이동 구간 감정 비율 (누적 영역 그래프)
+    for ax, window in zip(axs[:2], (7, 30)):
+        shares = np.nan_to_num(result["rolling"][window])
+        ax.stackplot(dates, shares.T, colors=colors, labels=emotions, step='post')
+        ax.set_ylim(0, 1)
+        ax.set_ylabel('비율')
+        ax.set_title(f'{window}일 이동 감정 비율')
+    axs[0].legend(bbox_to_anchor=(1.01, 1), loc="upper left")
+    
+    # 3. 감정별 최장 연속 기록
+    streaks = result["streaks"]
+    streak_emotions = [e for e in emotions if e in streaks]
+    lengths = [streaks[e]["length"] for e in streak_emotions]
+    bars = axs[2].barh(streak_emotions, lengths,
+                       color=[emotion_map.get(e, "#CCCCCC") for e in streak_emotions])
+    for bar, emotion in zip(bars, streak_emotions):
+        streak = streaks[emotion]
+        axs[2].text(bar.get_width() + 0.1, bar.get_y() + bar.get_height()/2,
+                    f"{streak['length']}일 ({streak['start']} ~ {streak['end']})",
+                    va='center', fontsize=8)
+    axs[2].set_xlabel('연속 일수')
+    axs[2].set_title('감정별 최장 연속 기록')
     
-    # 1. 날씨별 감정 분포
-    weather_types = [w for w in weather_emotion_map.keys() if not w.startswith("온도")]
-    x_pos = np.arange(len(weather_types))
+    plt.tight_layout()
+    perf.count_artists("draw_emotion_trends", plt.gcf())
+    plt.show()
+
+@perf.timed()
+def draw_emotion_transitions():
+    """하루 → 다음 날 감정 전이 확률 (마르코프 행렬)"""
+    records = load_records()
+    if not records:
+        print("표시할 기록이 없습니다.")
+        return
     
-    width = 0.8 / len(set(emotion for record in weather_records for emotion in [record["emotion"]]))
+    result = trends.analyze_trends(records, load_emotion_map().keys())
+    counts = result["transitions"]
+    if counts.sum() == 0:
+        print("연속된 날의 기록이 없어 감정 전이를 계산할 수 없습니다.")
+        return
     
-    # 모든 감정 목록
-    all_emotions = sorted(set(record["emotion"] for record in weather_records))
+    # 실제로 등장한 감정만 표시
+    used = np.flatnonzero(counts.sum(axis=0) + counts.sum(axis=1))
+    emotions = [result["emotions"][i] for i in used]
+    probs = result["transition_probs"][np.ix_(used, used)]
+    counts = counts[np.ix_(used, used)]
+    
+    fig, ax = render.subplots("transitions")
+    image = ax.imshow(probs, cmap='Blues', vmin=0, vmax=1)
+    
+    for i in range(len(emotions)):
+        for j in range(len(emotions)):
+            if counts[i, j]:
+                ax.text(j, i, f"{probs[i, j]:.2f}\n({counts[i, j]})", ha='center', va='center',
+                        fontsize=8, color='white' if probs[i, j] > 0.5 else 'black')
+    
+    ax.set_xticks(np.arange(len(emotions)))
+    ax.set_yticks(np.arange(len(emotions)))
+    ax.set_xticklabels(emotions)
+    ax.set_yticklabels(emotions)
+    ax.set_xlabel('다음 날 감정')
+    ax.set_ylabel('오늘 감정')
+    ax.set_title('감정 전이 확률')
+    fig.colorbar(image, ax=ax)
+    
+    plt.tight_layout()
+    perf.count_artists("draw_emotion_transitions", plt.gcf())
+    plt.show()
+
+@perf.timed()
+def draw_year_heatmap(start_year=None, end_year=None):
+    """연간 감정 히트맵 (열: 주, 행: 요일, 연도별로 아래로 쌓음)"""
+    records = query.query(start=f"{start_year}-01-01" if start_year is not None else None,
+                          end=f"{end_year}-12-31" if end_year is not None else None)
+    if not records:
+        print("표시할 기록이 없습니다.")
+        return
     
-    # 감정 맵 로드해서 색상 가져오기
     emotion_map = load_emotion_map()
+    start, daily, emotions = trends.encode_records(records, emotion_map.keys())
+    
+    # 색상표: 감정 색 + 기록 없음 + 해당 연도가 아닌 칸
+    no_record, blank = len(emotions), len(emotions) + 1
+    palette = np.array([to_rgb(emotion_map.get(e, "#CCCCCC")) for e in emotions]
+                       + [to_rgb("#EEEEEE"), to_rgb("white")])
+    
+    # 첫 해 1월 1일 ~ 마지막 해 12월 31일까지 모든 날짜
+    first_year = int(str(start)[:4])
+    last_year = int(str(start + (len(daily) - 1))[:4])
+    first_day = np.datetime64(f"{first_year}-01-01")
+    all_days = np.arange(first_day, np.datetime64(f"{last_year + 1}-01-01"))
+    
+    codes = np.full(len(all_days), no_record, dtype=np.int64)
+    offset = int((start - first_day).astype(np.int64))
+    recorded = daily >= 0
+    codes[offset:offset + len(daily)][recorded] = daily[recorded]
+    
+    # 날짜 → (행, 열) 좌표 (1970-01-01은 목요일이므로 +3 하면 월요일=0)
+    day_numbers = all_days.astype(np.int64)
+    weekdays = (day_numbers + 3) % 7
+    jan1 = all_days.astype("datetime64[Y]").astype("datetime64[D]")
+    jan1_weekdays = (jan1.astype(np.int64) + 3) % 7
+    year_index = all_days.astype("datetime64[Y]").astype(np.int64) - (first_year - 1970)
+    day_of_year = (all_days - jan1).astype(np.int64)
+    
+    rows_per_year = 8  # 요일 7줄 + 연도 사이 빈 줄
+    rows = year_index * rows_per_year + weekdays
+    cols = (day_of_year + jan1_weekdays) // 7
+    
+    n_years = last_year - first_year + 1
+    grid = np.full((n_years * rows_per_year - 1, 54), blank, dtype=np.int64)
+    grid[rows, cols] = codes
+    date_grid = np.full(grid.shape, -1, dtype=np.int64)
+    date_grid[rows, cols] = np.arange(len(all_days))
+    
+    image = palette[grid]
+    
+    fig, ax = render.subplots("year_heatmap", figsize=(14, max(2.5, 1.6 * n_years)))
+    ax.imshow(image, aspect='equal', interpolation='nearest')
+    
+    ax.set_yticks(np.arange(n_years) * rows_per_year + 3)
+    ax.set_yticklabels([str(year) for year in range(first_year, last_year + 1)])
+    month_starts = np.arange("2001-01", "2002-01", dtype="datetime64[M]").astype("datetime64[D]")
+    month_cols = (month_starts - np.datetime64("2001-01-01")).astype(np.int64) // 7
+    ax.set_xticks(month_cols)
+    ax.set_xticklabels([f"{m}월" for m in range(1, 13)])
+    ax.tick_params(length=0)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    
+    used = sorted(set(int(c) for c in np.unique(daily[recorded])))
+    legend = [mpatches.Patch(color=palette[i], label=emotions[i]) for i in used]
+    ax.legend(handles=legend, bbox_to_anchor=(1.01, 1), loc="upper left")
+    
+    # 호버: 좌표 → 날짜 인덱스 배열을 바로 조회
+    record_by_date = {r["date"]: r for r in records}
+    tooltip = ax.annotate("", (0, 0), xytext=(15, 15), textcoords="offset points",
+                          bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.8),
+                          arrowprops=dict(arrowstyle="->"), visible=False)
+    
+    def hover(event):
+        visible = False
+        if event.inaxes == ax and event.xdata is not None:
+            row, col = int(round(event.ydata)), int(round(event.xdata))
+            if 0 <= row < grid.shape[0] and 0 <= col < grid.shape[1] and date_grid[row, col] >= 0:
+                date_str = str(all_days[date_grid[row, col]])
+                record = record_by_date.get(date_str)
+                if record:
+                    tooltip_text = f"{date_str}\n{record['emotion']} - {record['note']}"
+                    if "weather" in record and record["weather"]:
+                        tooltip_text += f"\n{record['weather'].get('emoji', '')} {record['weather'].get('temp', '')}°C"
+                    tooltip.set_text(tooltip_text)
+                    tooltip.xy = (col, row)
+                    visible = True
+        if visible or tooltip.get_visible():
+            tooltip.set_visible(visible)
+            fig.canvas.draw_idle()
+    
+    fig.canvas.mpl_connect("motion_notify_event", hover)
     
-    # 각 감정별 막대 그래프 그리기
-    for i, emotion in enumerate(all_emotions):
-        heights = []
-        for weather in weather_types:
-            count = weather_emotion_map[weather].get(emotion, 0)
-            heights.append(count)
+    ax.set_title(f"연간 감정 히트맵 ({first_year}" + (f" ~ {last_year})" if last_year != first_year else ")"))
+    plt.tight_layout()
+    perf.count_artists("draw_year_heatmap", plt.gcf())
+    plt.show()
+
+# 기록이 이보다 많으면 전체 감정 지도 대신 스크롤 타임라인을 사용
+TIMELINE_THRESHOLD = 120
+
+@perf.timed()
+def draw_timeline(records=None, initial_days=90):
+    """확대/축소와 이동이 가능한 감정 타임라인
+
+    화면에 보이는 구간의 막대만 그리고, 확대 정도에 따라
+    일 → 주 → 월 단위 대표 감정(미리 계산한 피라미드)으로 바꿔 표시합니다.
+    스크롤: 확대/축소, ←/→: 이동, 툴바의 이동/확대 도구도 사용할 수 있습니다.
+    """
+    if records is None:
+        records = load_records()
+    if not records:
+        print("표시할 기록이 없습니다.")
+        return
+    
+    emotion_map = load_emotion_map()
+    start, daily, emotions = trends.encode_records(records, emotion_map.keys())
+    levels = trends.build_pyramid(start, daily, len(emotions))
+    palette = np.array([to_rgb(emotion_map.get(e, "#CCCCCC")) for e in emotions])
+    record_by_date = {r["date"]: r for r in records}
+    
+    first_day = int(start.astype(np.int64))
+    last_day = first_day + len(daily)
+    
+    fig, ax = render.subplots("timeline")
+    ax.xaxis_date()  # x 좌표 = 1970-01-01부터의 일수 (matplotlib 날짜 형식)
+    ax.set_ylim(0, 1)
+    ax.set_yticks([])
+    ax.set_xlim(max(first_day, last_day - initial_days), last_day)
+    ax.set_autoscale_on(False)
+    
+    used = sorted(set(int(c) for c in levels["day"][2]))
+    legend = [mpatches.Patch(color=palette[i], label=emotions[i]) for i in used]
+    ax.legend(handles=legend, bbox_to_anchor=(1.01, 1), loc="upper left")
+    
+    state = {"collection": None, "level": None, "title": None}
+    
+    def pick_level(lo, hi):
+        # 한 칸이 3픽셀 이상이 되는 가장 자세한 단위
+        days_per_pixel = (hi - lo) / max(ax.bbox.width, 1)
+        if days_per_pixel <= 1 / 3:
+            return "day"
+        if days_per_pixel <= 7 / 3:
+            return "week"
+        return "month"
+    
+    def redraw(_ax=None):
+        lo, hi = ax.get_xlim()
+        level = pick_level(lo, hi)
+        starts, widths, codes, _ = levels[level]
         
-        axs[0].bar(x_pos + i * width - width * len(all_emotions) / 2, 
-                  heights, 
-                  width=width, 
-                  label=emotion,
-                  color=emotion_map.get(emotion, "#CCCCCC"))
-    
-    axs[0].set_title('날씨별 감정 분포')
-    axs[0].set_xticks(x_pos)
-    axs[0].set_xticklabels(weather_types)
-    axs[0].legend()
-    
-    # 2. 온도별 감정 분포
-    temp_ranges = sorted([w for w in weather_emotion_map.keys() if w.startswith("온도")])
-    x_pos = np.arange(len(temp_ranges))
-    
-    # 각 감정별 막대 그래프 그리기
-    for i, emotion in enumerate(all_emotions):
-        heights = []
-        for temp_range in temp_ranges:
-            count = weather_emotion_map[temp_range].get(emotion, 0)
-            heights.append(count)
+        # 보이는 구간만 골라서 막대 생성
+        i0 = np.searchsorted(starts + widths, lo, side="right")
+        i1 = np.searchsorted(starts, hi, side="left")
+        if state["collection"] is not None:
+            state["collection"].remove()
+        gap = 0.1 if level == "day" else 0
+        state["collection"] = ax.broken_barh(
+            list(zip(starts[i0:i1], widths[i0:i1] - gap)), (0, 1),
+            facecolors=palette[codes[i0:i1]] if i1 > i0 else "none")
+        state["level"] = level
+        perf.count("draw_timeline.visible_bins", int(i1 - i0))
         
-        axs[1].bar(x_pos + i * width - width * len(all_emotions) / 2, 
-                  heights, 
-                  width=width, 
-                  label=emotion,
-                  color=emotion_map.get(emotion, "#CCCCCC"))
+        unit = {"day": "일", "week": "주", "month": "월"}[level]
+        ax.set_title(f"감정 타임라인 ({unit} 단위, 스크롤: 확대/축소, ←/→: 이동)")
+        fig.canvas.draw_idle()
+    
+    def zoom(center, factor):
+        lo, hi = ax.get_xlim()
+        span = min(max((hi - lo) * factor, 7), (last_day - first_day) + 60)
+        left = center - (center - lo) * span / (hi - lo)
+        ax.set_xlim(left, left + span)
+    
+    def on_scroll(event):
+        if event.inaxes == ax and event.xdata is not None:
+            zoom(event.xdata, 0.8 if event.button == "up" else 1.25)
+    
+    def on_key(event):
+        lo, hi = ax.get_xlim()
+        step = (hi - lo) / 2
+        if event.key == "left":
+            ax.set_xlim(lo - step, hi - step)
+        elif event.key == "right":
+            ax.set_xlim(lo + step, hi + step)
+    
+    tooltip = ax.annotate("", (0, 0.5), xytext=(15, 15), textcoords="offset points",
+                          bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.8),
+                          arrowprops=dict(arrowstyle="->"), visible=False)
     
-    axs[1].set_title('온도별 감정 분포')
-    axs[1].set_xticks(x_pos)
-    axs[1].set_xticklabels(temp_ranges)
-    axs[1].legend()
+    def hover(event):
+        visible = False
+        if event.inaxes == ax and event.xdata is not None:
+            starts, widths, codes, counts = levels[state["level"]]
+            i = np.searchsorted(starts, event.xdata, side="right") - 1
+            if i >= 0 and event.xdata < starts[i] + widths[i]:
+                first = np.datetime64(int(starts[i]), "D")
+                emotion = emotions[codes[i]]
+                if state["level"] == "day":
+                    record = record_by_date.get(str(first), {})
+                    text = f"{first}\n{emotion} - {record.get('note', '')}"
+                    if record.get("weather"):
+                        text += f"\n{record['weather'].get('emoji', '')} {record['weather'].get('temp', '')}°C"
+                else:
+                    last = first + int(widths[i]) - 1
+                    summary = ", ".join(f"{emotions[j]} {counts[i][j]}"
+                                        for j in np.argsort(-counts[i]) if counts[i][j])
+                    text = f"{first} ~ {last}\n대표 감정: {emotion}\n{summary}"
+                tooltip.set_text(text)
+                tooltip.xy = (event.xdata, 0.5)
+                visible = True
+        if visible or tooltip.get_visible():
+            tooltip.set_visible(visible)
+            fig.canvas.draw_idle()
+    
+    ax.callbacks.connect("xlim_changed", redraw)
+    fig.canvas.mpl_connect("scroll_event", on_scroll)
+    fig.canvas.mpl_connect("key_press_event", on_key)
+    fig.canvas.mpl_connect("motion_notify_event", hover)
     
     plt.tight_layout()
+    redraw()
+    perf.count_artists("draw_timeline", plt.gcf())
     plt.show()
 
 def show_menu():
@@ -450,7 +705,11 @@ def show_menu():
     print("4. 월간 감정 캘린더")
     print("5. 감정 분포 통계")
     print("6. 날씨-감정 상관관계 분석")
-    print("7. 돌아가기")
+    print("7. 감정 추세 (이동 비율, 연속 기록)")
+    print("8. 감정 전이 행렬")
+    print("9. 연간 감정 히트맵")
+    print("10. 스크롤 타임라인 (전체 기간)")
+    print("11. 돌아가기")
     
     choice = input("\n선택: ").strip()
     
@@ -458,10 +717,12 @@ def show_menu():
         records = load_records()
         draw_emotion_map(records, 'all')
     elif choice == "2":
-        records = load_records()
+        start, end = period_range('month')
+        records = query.query(start=start, end=end)
         draw_emotion_map(records, 'month')
     elif choice == "3":
-        records = load_records()
+        start, end = period_range('week')
+        records = query.query(start=start, end=end)
         draw_emotion_map(records, 'week')
     elif choice == "4":
         now = datetime.now()
@@ -490,6 +751,24 @@ def show_menu():
     elif choice == "6":
         analyze_weather_emotion()
     elif choice == "7":
+        draw_emotion_trends()
+    elif choice == "8":
+        draw_emotion_transitions()
+    elif choice == "9":
+        year_range = input("\n표시할 연도 (예: 2024 또는 2015-2024, 비워두면 전체): ").strip()
+        try:
+            if not year_range:
+                draw_year_heatmap()
+            elif "-" in year_range:
+                start_year, end_year = (int(y) for y in year_range.split("-", 1))
+                draw_year_heatmap(start_year, end_year)
+            else:
+                draw_year_heatmap(int(year_range), int(year_range))
+        except ValueError:
+            print("유효한 연도를 입력해주세요.")
+    elif choice == "10":
+        draw_timeline()
+    elif choice == "11":
         return
     else:
         print("잘못된 선택입니다. 다시 선택해주세요.")
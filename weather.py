@@ -1,14 +1,24 @@
 import requests
 import json
 import os
+import threading
+import time
 from datetime import datetime
 
+import perf
+
 # OpenWeatherMap API 설정
 # 무료 API 키를 발급받아 사용해야 합니다: https://openweathermap.org/api
 API_KEY = "YOUR_API_KEY" # 여기에 발급받은 API 키를 입력하세요
 BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
 WEATHER_CACHE_FILE = "data/weather_cache.json"
 
+# API 호출 제한 (토큰 버킷)
+# OpenWeatherMap 무료 플랜은 분당 60회까지 허용됩니다.
+# 제한을 넘는 호출은 실패시키지 않고 토큰이 생길 때까지 기다립니다.
+RATE_LIMIT_PER_MINUTE = 60
+RATE_LIMIT_BURST = 10
+
 # 날씨 아이콘 이모지 매핑
 WEATHER_EMOJI = {
     "Clear": "☀️",
@@ -27,11 +37,14 @@ WEATHER_EMOJI = {
     "Tornado": "🌪️"
 }
 
+@perf.timed()
 def load_weather_cache():
     """날씨 캐시 파일 로드"""
     os.makedirs("data", exist_ok=True)
     
     if os.path.exists(WEATHER_CACHE_FILE):
+        if perf.ENABLED:
+            perf.count("weather_cache.bytes_read", os.path.getsize(WEATHER_CACHE_FILE))
         try:
             with open(WEATHER_CACHE_FILE, "r", encoding="utf-8") as f:
                 return json.load(f)
@@ -44,7 +57,96 @@ def save_weather_cache(cache):
     """날씨 캐시 저장"""
     with open(WEATHER_CACHE_FILE, "w", encoding="utf-8") as f:
         json.dump(cache, f, ensure_ascii=False, indent=2)
+    
+    if perf.ENABLED:
+        perf.count("weather_cache.bytes_written", os.path.getsize(WEATHER_CACHE_FILE))
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+    def __init__(self, rate_per_minute, capacity):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 가져감 (없으면 기다림). 기다렸으면 True 반환"""
+        delayed = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return delayed
+                wait = (1 - self.tokens) / self.rate
+            delayed = True
+            time.sleep(wait)
+
+class _InFlight:
+    """진행 중인 API 호출 하나 (같은 키의 요청들이 결과를 공유)"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+_rate_limiter = TokenBucket(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+_inflight = {}
+_inflight_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_stats = {"api_calls": 0, "calls_saved": 0, "calls_delayed": 0}
+
+def configure_rate_limit(rate_per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST):
+    """API 호출 제한 변경"""
+    global _rate_limiter
+    _rate_limiter = TokenBucket(rate_per_minute, burst)
+
+def _count(name):
+    with _inflight_lock:
+        _stats[name] += 1
+    perf.count(f"weather.{name}")
+
+def get_stats():
+    """API 호출 통계 (실제 호출, 합쳐져서 절약된 호출, 제한으로 지연된 호출)"""
+    with _inflight_lock:
+        return dict(_stats)
+
+def _fetch_weather(city, country_code, today):
+    """API에서 날씨 정보 가져오기 (실패 시 None)"""
+    params = {
+        "q": f"{city},{country_code}",
+        "appid": API_KEY,
+        "units": "metric"  # 섭씨 온도
+    }
+    
+    if _rate_limiter.acquire():
+        _count("calls_delayed")
+    
+    try:
+        _count("api_calls")
+        with perf.span("weather.api_request"):
+            response = requests.get(BASE_URL, params=params)
+        data = response.json()
+        
+        if response.status_code == 200:
+            return {
+                "date": today,
+                "weather": data["weather"][0]["main"],
+                "description": data["weather"][0]["description"],
+                "temp": round(data["main"]["temp"], 1),
+                "feels_like": round(data["main"]["feels_like"], 1),
+                "humidity": data["main"]["humidity"],
+                "emoji": WEATHER_EMOJI.get(data["weather"][0]["main"], "🌡️")
+            }
+        else:
+            print(f"⚠️ 날씨 정보를 가져오는데 실패했습니다: {data.get('message', '알 수 없는 오류')}")
+            return None
+    except Exception as e:
+        print(f"⚠️ 날씨 API 호출 중 오류 발생: {e}")
+        return None
 
+@perf.timed()
 def get_weather(city="Seoul", country_code="kr", use_cache=True):
     """특정 도시의 현재 날씨 정보 가져오기"""
     today = datetime.now().strftime("%Y-%m-%d")
@@ -54,7 +156,9 @@ def get_weather(city="Seoul", country_code="kr", use_cache=True):
     if use_cache:
         cache = load_weather_cache()
         if cache_key in cache:
+            perf.count("weather_cache.hits")
             return cache[cache_key]
+        perf.count("weather_cache.misses")
     
     # API 키가 설정되지 않은 경우
     if API_KEY == "YOUR_API_KEY":
@@ -69,41 +173,44 @@ def get_weather(city="Seoul", country_code="kr", use_cache=True):
             "emoji": "❓"
         }
     
-    # API에서 날씨 정보 가져오기
-    params = {
-        "q": f"{city},{country_code}",
-        "appid": API_KEY,
-        "units": "metric"  # 섭씨 온도
-    }
+    # 같은 키로 이미 진행 중인 호출이 있으면 그 결과를 기다림
+    with _inflight_lock:
+        call = _inflight.get(cache_key)
+        leader = call is None
+        if leader:
+            call = _InFlight()
+            _inflight[cache_key] = call
+    
+    if not leader:
+        _count("calls_saved")
+        call.done.wait()
+        return call.result
     
     try:
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
-        
-        if response.status_code == 200:
-            weather = {
-                "date": today,
-                "weather": data["weather"][0]["main"],
-                "description": data["weather"][0]["description"],
-                "temp": round(data["main"]["temp"], 1),
-                "feels_like": round(data["main"]["feels_like"], 1),
-                "humidity": data["main"]["humidity"],
-                "emoji": WEATHER_EMOJI.get(data["weather"][0]["main"], "🌡️")
-            }
-            
-            # 결과 캐싱
-            if use_cache:
+        # 캐시를 확인한 뒤 앞선 호출이 끝나 캐시에 썼을 수 있으므로 한 번 더 확인
+        if use_cache:
+            with _cache_lock:
+                cached = load_weather_cache().get(cache_key)
+            if cached:
+                _count("calls_saved")
+                call.result = cached
+                return cached
+
+        weather = _fetch_weather(city, country_code, today)
+
+        # 결과 캐싱
+        if weather and use_cache:
+            with _cache_lock:
                 cache = load_weather_cache()
                 cache[cache_key] = weather
                 save_weather_cache(cache)
-                
-            return weather
-        else:
-            print(f"⚠️ 날씨 정보를 가져오는데 실패했습니다: {data.get('message', '알 수 없는 오류')}")
-            return None
-    except Exception as e:
-        print(f"⚠️ 날씨 API 호출 중 오류 발생: {e}")
-        return None
+        
+        call.result = weather
+        return weather
+    finally:
+        with _inflight_lock:
+            del _inflight[cache_key]
+        call.done.set()
 
 def get_weather_summary(weather_data):
     """날씨 정보를 요약해서 반환"""